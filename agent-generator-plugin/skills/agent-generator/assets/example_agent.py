@@ -7,7 +7,7 @@ This template shows the complete structure of a production-ready agent:
 - Error handling and logging
 - Memory persistence (Redis optional)
 - Agent initialization
-- Main execution loop
+- Main execution loop (CLI or long-running HTTP server)
 
 Copy and customize this for your own agents.
 """
@@ -17,21 +17,34 @@ import sys
 import json
 import logging
 import asyncio
-from typing import Optional
+import re
+import contextlib
+import functools
+import random
+import time
+from collections import OrderedDict
+from datetime import datetime, time as dt_time, timedelta
+from typing import Awaitable, Callable, Optional
+from zoneinfo import ZoneInfo
 
-# Agent framework
-from langgraph.prebuilt import create_react_agent
+import aiohttp
+
+# Agent framework (langgraph itself is imported on first use in get_agent;
+# redis and langchain_community in init_response_cache / init_redis_memory)
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 
-# Optional: Redis memory
+# Optional: faster JSON encoding/decoding
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: proactive per-provider rate limiting
 try:
-    from langchain_community.chat_message_histories import RedisChatMessageHistory
-    from langchain_core.runnables.history import RunnableWithMessageHistory
-    import redis
-    REDIS_AVAILABLE = True
+    from aiolimiter import AsyncLimiter
 except ImportError:
-    REDIS_AVAILABLE = False
+    AsyncLimiter = None
 
 # === Logging Configuration ===
 logging.basicConfig(
@@ -40,82 +53,382 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# === JSON Helpers ===
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+def _json_dumps(obj) -> str:
+    """Indented JSON text, via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+            default=str
+        ).decode()
+    return json.dumps(obj, indent=2, default=str)
+
+def _json_print(obj):
+    """Write indented JSON to stdout without holding a second copy as str."""
+    if orjson is not None:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(
+            obj,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+            default=str
+        ))
+        sys.stdout.buffer.flush()
+    else:
+        json.dump(obj, sys.stdout, indent=2, default=str)
+        sys.stdout.write("\n")
+
+# === HTTP Session ===
+
+# Retry transient provider failures (rate limits, gateway errors)
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRIES = 3
+_BACKOFF_FACTOR = 0.3
+_MAX_BACKOFF = 4.0
+# Total time one request may spend waiting between retries
+_RETRY_DEADLINE = 10.0
+
+# Free-tier request budgets: (max requests, per seconds). Throttling up
+# front is cheaper than burning requests on 429 retries.
+_PROVIDER_RATE_LIMITS = {
+    "finnhub": (60, 60),
+    "polygon": (5, 60),
+    "alphavantage": (5, 60),
+}
+_provider_limiters: dict = {}
+
+_http_session: Optional[aiohttp.ClientSession] = None
+
+def _connection_trace() -> aiohttp.TraceConfig:
+    """Log whether requests open new connections or reuse pooled ones."""
+    async def on_create(session, ctx, params):
+        logger.debug("HTTP connection opened")
+    
+    async def on_reuse(session, ctx, params):
+        logger.debug("HTTP connection reused from pool")
+    
+    trace = aiohttp.TraceConfig()
+    trace.on_connection_create_end.append(on_create)
+    trace.on_connection_reuseconn.append(on_reuse)
+    return trace
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared HTTP session, creating it inside the running event loop."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        # Keep-alive pool shared by the three API hosts so the TLS
+        # handshake is paid once per host, not once per tool call
+        connector = aiohttp.TCPConnector(limit=16, limit_per_host=4, ttl_dns_cache=300)
+        _http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=10),
+            trace_configs=[_connection_trace()]
+        )
+    return _http_session
+
+async def close_http_session() -> None:
+    """Close the shared HTTP session (call before the event loop shuts down)."""
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+
+def _rate_limiter(provider: str):
+    """Return the provider's limiter (a no-op without aiolimiter installed)."""
+    if AsyncLimiter is None:
+        return contextlib.nullcontext()
+    limiter = _provider_limiters.get(provider)
+    if limiter is None:
+        limiter = _provider_limiters[provider] = AsyncLimiter(*_PROVIDER_RATE_LIMITS[provider])
+    return limiter
+
+async def _get_json(provider: str, url: str, params: dict) -> Optional[dict]:
+    """
+    GET a JSON payload using the shared session.
+    
+    Requests are throttled to the provider's rate limit. Rate-limit and
+    gateway errors are retried with capped, jittered exponential backoff
+    until _RETRY_DEADLINE runs out.
+    Returns None if the provider still answers with an error status.
+    """
+    deadline = time.monotonic() + _RETRY_DEADLINE
+    for attempt in range(_MAX_RETRIES + 1):
+        async with _rate_limiter(provider):
+            async with get_http_session().get(url, params=params) as response:
+                if response.ok:
+                    return await response.json(loads=_json_loads)
+                if response.status not in _RETRY_STATUSES or attempt == _MAX_RETRIES:
+                    logger.error(f"API error: {response.status}")
+                    return None
+        # Jitter keeps concurrent symbols from retrying in lockstep
+        delay = min(_BACKOFF_FACTOR * (2 ** attempt), _MAX_BACKOFF) + random.uniform(0, _BACKOFF_FACTOR)
+        if time.monotonic() + delay > deadline:
+            logger.error(f"API error: {response.status} (retry deadline reached)")
+            return None
+        await asyncio.sleep(delay)
+    return None
+
+# === Response Cache (Optional) ===
+
+# Shared asyncio Redis client, set by init_response_cache(). Size the cache with
+# `maxmemory-policy allkeys-lru` on the server rather than trimming here.
+_CACHE = None
+
+_MARKET_TZ = ZoneInfo("America/New_York")
+_MARKET_OPEN = dt_time(9, 30)
+_MARKET_CLOSE = dt_time(16, 0)
+
+class DataUnavailable(Exception):
+    """Provider answered, but without usable data (never cached)."""
+
+class _TTLCache:
+    """Bounded LRU cache whose entries expire after `ttl` seconds."""
+    
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+    
+    def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: str) -> None:
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+# In-process tier: dedupes repeated calls within a session without a Redis RTT
+_LOCAL_CACHE = _TTLCache(maxsize=256, ttl=60)
+
+def _ttl_for(now: Optional[datetime] = None) -> int:
+    """Cache TTL: 15 min during US market hours, otherwise until the next open (max 24 h)."""
+    now = now or datetime.now(_MARKET_TZ)
+    if now.weekday() < 5 and _MARKET_OPEN <= now.time() < _MARKET_CLOSE:
+        return 900
+    
+    next_open = now.replace(hour=9, minute=30, second=0, microsecond=0)
+    if now >= next_open:
+        next_open += timedelta(days=1)
+    while next_open.weekday() >= 5:
+        next_open += timedelta(days=1)
+    return max(60, min(86400, int((next_open - now).total_seconds())))
+
+async def _cached(namespace: str, key: str, fetch: Callable[[], Awaitable[str]]) -> str:
+    """
+    Serve a tool result from cache, calling fetch() and storing it on a miss.
+    
+    Checks the in-process TTL cache first, then Redis (when configured).
+    """
+    cache_key = f"{namespace}:{key}"
+    value = _LOCAL_CACHE.get(cache_key)
+    if value is not None:
+        return value
+    
+    if _CACHE is None:
+        value = await fetch()
+        _LOCAL_CACHE.set(cache_key, value)
+        return value
+    
+    redis_key = f"stock_agent:cache:{cache_key}"
+    try:
+        hit = await _CACHE.get(redis_key)
+        if hit is not None:
+            logger.info(f"Cache hit: {cache_key}")
+            _LOCAL_CACHE.set(cache_key, hit)
+            return hit
+    except Exception as e:
+        logger.warning(f"Cache read failed: {e}")
+        return await fetch()
+    
+    value = await fetch()
+    _LOCAL_CACHE.set(cache_key, value)
+    try:
+        await _CACHE.setex(redis_key, _ttl_for(), value)
+    except Exception as e:
+        logger.warning(f"Cache write failed: {e}")
+    return value
+
+async def init_response_cache() -> None:
+    """Connect the tool response cache to Redis if available."""
+    global _CACHE
+    try:
+        import redis.asyncio as aioredis
+    except ImportError:
+        logger.warning("Redis not available - caching tool responses in-process only")
+        return
+    
+    try:
+        client = aioredis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            max_connections=int(os.getenv("REDIS_POOL_SIZE", "10")),
+            decode_responses=True
+        )
+        await client.ping()
+    except Exception as e:
+        logger.warning(f"Response cache unavailable: {e}")
+        return
+    _CACHE = client
+
+# === Data Fetchers ===
+
+async def _load_sentiment(symbol: str) -> str:
+    """Fetch news sentiment from Finnhub."""
+    api_key = os.getenv("FINNHUB_API_KEY")
+    if not api_key:
+        raise ValueError("FINNHUB_API_KEY not set")
+    
+    data = await _get_json(
+        "finnhub",
+        "https://finnhub.io/api/v1/news-sentiment",
+        params={"symbol": symbol, "token": api_key}
+    )
+    if data is None:
+        raise DataUnavailable("Sentiment unavailable - API error")
+    
+    score = data.get("companyNewsScore", 0)
+    logger.info(f"Sentiment for {symbol}: {score:.2f}")
+    return f"Sentiment score: {score:.2f} (range: -1.0 to +1.0)"
+
+async def _load_price(symbol: str) -> str:
+    """Fetch previous-day OHLCV from Polygon."""
+    api_key = os.getenv("POLYGON_API_KEY")
+    if not api_key:
+        raise ValueError("POLYGON_API_KEY not set")
+    
+    data = await _get_json(
+        "polygon",
+        f"https://api.polygon.io/v2/aggs/ticker/{symbol}/prev",
+        params={"apiKey": api_key}
+    )
+    if not data or not data.get("results"):
+        raise DataUnavailable("Price unavailable - no data")
+    
+    r = data["results"][0]
+    logger.info(f"Price for {symbol}: ${r['c']:.2f}")
+    return (
+        f"${symbol}: "
+        f"Open=${r['o']:.2f} High=${r['h']:.2f} "
+        f"Low=${r['l']:.2f} Close=${r['c']:.2f} "
+        f"Volume={r['v']:,.0f}"
+    )
+
+async def _load_technical_analysis(symbol: str, indicator: str) -> str:
+    """Fetch a technical indicator series from Alpha Vantage."""
+    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    if not api_key:
+        raise ValueError("ALPHA_VANTAGE_API_KEY not set")
+    
+    data = await _get_json(
+        "alphavantage",
+        "https://www.alphavantage.co/query",
+        params={
+            "function": indicator,
+            "symbol": symbol,
+            "interval": "daily",
+            "apikey": api_key
+        }
+    )
+    if data is None:
+        raise DataUnavailable("Technical data unavailable")
+    if "Error Message" in data:
+        raise DataUnavailable(f"API error: {data['Error Message']}")
+    
+    logger.info(f"Technical analysis for {symbol}: {indicator}")
+    return _json_dumps(data)[:500]  # Truncate for brevity
+
+async def _fetch_sentiment(symbol: str) -> str:
+    """Sentiment for a symbol, as text for the agent."""
+    symbol = symbol.upper()
+    try:
+        return await _cached("finnhub", symbol, lambda: _load_sentiment(symbol))
+    except DataUnavailable as e:
+        return str(e)
+    except Exception as e:
+        logger.error(f"Error getting sentiment: {e}")
+        return f"Error: {str(e)}"
+
+async def _fetch_price(symbol: str) -> str:
+    """Price data for a symbol, as text for the agent."""
+    symbol = symbol.upper()
+    try:
+        return await _cached("polygon", symbol, lambda: _load_price(symbol))
+    except DataUnavailable as e:
+        return str(e)
+    except Exception as e:
+        logger.error(f"Error getting price: {e}")
+        return f"Error: {str(e)}"
+
+async def _fetch_technical_analysis(symbol: str, indicator: str = "SMA") -> str:
+    """Technical indicator data for a symbol, as text for the agent."""
+    symbol = symbol.upper()
+    try:
+        return await _cached(
+            "alphavantage",
+            f"{symbol}:{indicator}",
+            lambda: _load_technical_analysis(symbol, indicator)
+        )
+    except DataUnavailable as e:
+        return str(e)
+    except Exception as e:
+        logger.error(f"Error getting technical analysis: {e}")
+        return f"Error: {str(e)}"
+
+async def fetch_all(symbol: str) -> dict:
+    """
+    Fetch sentiment, price, and SMA technicals concurrently.
+    
+    Wall-clock is bounded by the slowest provider rather than the sum
+    of all three round trips.
+    """
+    sentiment, price, technicals = await asyncio.gather(
+        _fetch_sentiment(symbol),
+        _fetch_price(symbol),
+        _fetch_technical_analysis(symbol, "SMA"),
+        return_exceptions=True
+    )
+    results = {"sentiment": sentiment, "price": price, "technicals": technicals}
+    return {
+        name: f"Error: {value}" if isinstance(value, BaseException) else value
+        for name, value in results.items()
+    }
+
 # === Tool Definitions ===
 
 class GetStockSentimentInput(BaseModel):
     symbol: str = Field(description="Stock ticker symbol (e.g., AAPL)")
 
 @tool(args_schema=GetStockSentimentInput)
-def get_stock_sentiment(symbol: str) -> str:
+async def get_stock_sentiment(symbol: str) -> str:
     """
     Get market sentiment for a stock from recent news.
     
     Sentiment ranges from -1.0 (very negative) to +1.0 (very positive).
     Requires FINNHUB_API_KEY environment variable.
     """
-    try:
-        api_key = os.getenv("FINNHUB_API_KEY")
-        if not api_key:
-            raise ValueError("FINNHUB_API_KEY not set")
-        
-        import requests
-        response = requests.get(
-            "https://finnhub.io/api/v1/news-sentiment",
-            params={"symbol": symbol.upper(), "token": api_key},
-            timeout=10
-        )
-        
-        if response.ok:
-            data = response.json()
-            score = data.get("companyNewsScore", 0)
-            logger.info(f"Sentiment for {symbol}: {score:.2f}")
-            return f"Sentiment score: {score:.2f} (range: -1.0 to +1.0)"
-        else:
-            logger.error(f"API error: {response.status_code}")
-            return "Sentiment unavailable - API error"
-            
-    except Exception as e:
-        logger.error(f"Error getting sentiment: {e}")
-        return f"Error: {str(e)}"
+    return await _fetch_sentiment(symbol)
 
 class GetStockPriceInput(BaseModel):
     symbol: str = Field(description="Stock ticker symbol")
 
 @tool(args_schema=GetStockPriceInput)
-def get_stock_price(symbol: str) -> str:
+async def get_stock_price(symbol: str) -> str:
     """
     Get real-time stock price and OHLCV data.
     
     Returns open, high, low, close prices and volume.
     Requires POLYGON_API_KEY environment variable.
     """
-    try:
-        api_key = os.getenv("POLYGON_API_KEY")
-        if not api_key:
-            raise ValueError("POLYGON_API_KEY not set")
-        
-        import requests
-        response = requests.get(
-            f"https://api.polygon.io/v2/aggs/ticker/{symbol.upper()}/prev",
-            params={"apiKey": api_key},
-            timeout=10
-        )
-        
-        if response.ok and response.json().get("results"):
-            r = response.json()["results"][0]
-            logger.info(f"Price for {symbol}: ${r['c']:.2f}")
-            return (
-                f"${symbol.upper()}: "
-                f"Open=${r['o']:.2f} High=${r['h']:.2f} "
-                f"Low=${r['l']:.2f} Close=${r['c']:.2f} "
-                f"Volume={r['v']:,.0f}"
-            )
-        else:
-            return "Price unavailable - no data"
-            
-    except Exception as e:
-        logger.error(f"Error getting price: {e}")
-        return f"Error: {str(e)}"
+    return await _fetch_price(symbol)
 
 class GetTechnicalInput(BaseModel):
     symbol: str = Field(description="Stock ticker symbol")
@@ -125,7 +438,7 @@ class GetTechnicalInput(BaseModel):
     )
 
 @tool(args_schema=GetTechnicalInput)
-def get_technical_analysis(symbol: str, indicator: str = "SMA") -> str:
+async def get_technical_analysis(symbol: str, indicator: str = "SMA") -> str:
     """
     Get technical analysis indicators.
     
@@ -133,62 +446,75 @@ def get_technical_analysis(symbol: str, indicator: str = "SMA") -> str:
     MACD (Moving Average Convergence), BBANDS (Bollinger Bands)
     Requires ALPHA_VANTAGE_API_KEY environment variable.
     """
-    try:
-        api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
-        if not api_key:
-            raise ValueError("ALPHA_VANTAGE_API_KEY not set")
-        
-        import requests
-        response = requests.get(
-            "https://www.alphavantage.co/query",
-            params={
-                "function": indicator,
-                "symbol": symbol.upper(),
-                "interval": "daily",
-                "apikey": api_key
-            },
-            timeout=10
-        )
-        
-        if response.ok:
-            data = response.json()
-            if "Error Message" in data:
-                return f"API error: {data['Error Message']}"
-            logger.info(f"Technical analysis for {symbol}: {indicator}")
-            return json.dumps(data, indent=2)[:500]  # Truncate for brevity
-        else:
-            return "Technical data unavailable"
-            
-    except Exception as e:
-        logger.error(f"Error getting technical analysis: {e}")
-        return f"Error: {str(e)}"
+    return await _fetch_technical_analysis(symbol, indicator)
+
+class FetchAllInput(BaseModel):
+    symbol: str = Field(description="Stock ticker symbol")
+
+@tool(args_schema=FetchAllInput)
+async def fetch_all_stock_data(symbol: str) -> str:
+    """
+    Get sentiment, price, and SMA technicals for a stock in one call.
+    
+    All three providers are queried concurrently. Prefer this over calling
+    the individual tools when a full picture of the stock is needed.
+    """
+    data = await fetch_all(symbol)
+    return (
+        f"Sentiment: {data['sentiment']}\n"
+        f"Price: {data['price']}\n"
+        f"Technicals (SMA): {data['technicals']}"
+    )
 
 # === Memory Initialization (Optional) ===
 
 def init_redis_memory() -> Optional[callable]:
     """Initialize Redis memory if available."""
-    if not REDIS_AVAILABLE:
+    # Imported here so agents without Redis never pay for these modules
+    try:
+        import redis
+        from langchain_community.chat_message_histories import RedisChatMessageHistory
+        from langchain_core.messages import message_to_dict
+    except ImportError:
         logger.warning("Redis not available - using in-memory storage")
         return None
     
+    class PipelinedRedisHistory(RedisChatMessageHistory):
+        """Appends a turn's messages and refreshes the TTL in one round trip."""
+        
+        def add_messages(self, messages) -> None:
+            # LPUSH like add_message, so the stored order is unchanged
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                for message in messages:
+                    pipe.lpush(self.key, json.dumps(message_to_dict(message)))
+                if self.ttl:
+                    pipe.expire(self.key, self.ttl)
+                pipe.execute()
+    
     try:
         redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-        pool = redis.ConnectionPool.from_url(
+        pool_size = int(os.getenv("REDIS_POOL_SIZE", "10"))
+        
+        # Chat history decodes raw bytes itself, so its pool is built
+        # without decode_responses and shared by every session
+        history_client = redis.Redis(connection_pool=redis.ConnectionPool.from_url(
             redis_url,
-            max_connections=10,
-            decode_responses=True
-        )
-        redis_client = redis.Redis(connection_pool=pool)
-        redis_client.ping()
+            max_connections=pool_size
+        ))
+        history_client.ping()
         logger.info("Redis connection established")
         
         def get_history(session_id: str):
-            return RedisChatMessageHistory(
+            history = PipelinedRedisHistory(
                 session_id=f"stock_agent:{session_id}",
                 url=redis_url,
                 key_prefix="agent:memory:",
                 ttl=int(os.getenv("SESSION_TTL", 3600))
             )
+            # redis-py connects lazily, so the client built from url= never
+            # opens a socket once it is swapped for the pooled one
+            history.redis_client = history_client
+            return history
         
         return get_history
         
@@ -199,53 +525,134 @@ def init_redis_memory() -> Optional[callable]:
 
 # === Agent Setup ===
 
-logger.info("Initializing stock sentiment agent...")
+MODEL = "anthropic:claude-sonnet-4-20250514"
+
+# Queries that are just a plain ticker request skip the agent's planning turns
+_FAST_PATH_RE = re.compile(r"(?i)\s*analyze (?P<symbol>[A-Z]{1,5}) stock\W*")
+
+SUMMARY_PROMPT = """You are an expert stock analyst. Using the sentiment, price, and
+technical data provided, give a balanced analysis that considers all three
+data points. Clearly state any limitations (missing data, API errors)."""
 
 # Tool list
-tools = [get_stock_sentiment, get_stock_price, get_technical_analysis]
+tools = [fetch_all_stock_data, get_stock_sentiment, get_stock_price, get_technical_analysis]
 
-# Create agent
-agent = create_react_agent(
-    model="anthropic:claude-sonnet-4-20250514",
-    tools=tools,
-    prompt="""You are an expert stock analyst. When analyzing stocks:
+SYSTEM_PROMPT = """You are an expert stock analyst. When analyzing stocks:
 
-1. Always check sentiment first to understand market perception
+1. Check sentiment to understand market perception
 2. Get real-time prices to confirm current valuation
 3. Use technical indicators to identify trends
 4. Provide balanced analysis considering all three data points
 5. Clearly state any limitations (missing data, API errors)
 
-When the user asks about a stock, gather all available data before providing analysis."""
-)
+When the user asks about a stock, gather all available data before providing analysis.
+Use fetch_all_stock_data to get sentiment, price, and SMA technicals in a single step.
+The data tools are independent, so when you need several of them call them in parallel."""
 
-# Optional: Add Redis memory
-memory_accessor = init_redis_memory()
+@functools.cache
+def get_memory_accessor():
+    """Session history factory from init_redis_memory() (None without Redis), built once."""
+    return init_redis_memory()
 
-if memory_accessor and REDIS_AVAILABLE:
-    agent_with_memory = RunnableWithMessageHistory(
-        agent,
-        get_session_history=memory_accessor,
-        input_messages_key="messages",
-        history_messages_key="history"
+@functools.cache
+def get_agent():
+    """Build the agent, with Redis memory when available, on first use."""
+    from langgraph.prebuilt import create_react_agent
+    
+    logger.info("Initializing stock sentiment agent...")
+    
+    agent = create_react_agent(
+        model=MODEL,
+        tools=tools,
+        prompt=SYSTEM_PROMPT
     )
-    logger.info("Agent initialized with Redis memory")
-else:
-    agent_with_memory = agent
+    
+    # Optional: Add Redis memory
+    memory_accessor = get_memory_accessor()
+    
+    if memory_accessor:
+        from langchain_core.runnables.history import RunnableWithMessageHistory
+        
+        logger.info("Agent initialized with Redis memory")
+        return RunnableWithMessageHistory(
+            agent,
+            get_session_history=memory_accessor,
+            input_messages_key="messages",
+            history_messages_key="history"
+        )
+    
     logger.warning("Agent initialized without persistent memory")
+    return agent
+
+@functools.cache
+def get_summary_model():
+    """Chat model used directly by the fast path (no tools, no agent loop)."""
+    from langchain.chat_models import init_chat_model
+    
+    return init_chat_model(MODEL)
+
+async def _fast_path_analysis(symbol: str) -> dict:
+    """Fetch all data concurrently, then summarize it in a single LLM call."""
+    data = await fetch_all(symbol)
+    user_message = (
+        f"Analyze {symbol.upper()} stock.\n\n"
+        f"Sentiment: {data['sentiment']}\n"
+        f"Price: {data['price']}\n"
+        f"Technicals (SMA): {data['technicals']}"
+    )
+    response = await get_summary_model().ainvoke([
+        {"role": "system", "content": SUMMARY_PROMPT},
+        {"role": "user", "content": user_message}
+    ])
+    return {"messages": [response], "data": data}
+
+async def _record_turn(session_id: Optional[str], user_message: str, reply) -> None:
+    """Append a fast-path exchange to the session's Redis history, when configured."""
+    get_history = get_memory_accessor()
+    if not session_id or get_history is None:
+        return
+    
+    from langchain_core.messages import HumanMessage
+    
+    try:
+        history = get_history(session_id)
+        await asyncio.to_thread(history.add_messages, [HumanMessage(content=user_message), reply])
+    except Exception as e:
+        logger.warning(f"Could not save session history: {e}")
 
 # === Main Execution ===
 
-async def analyze_stock(symbol: str, session_id: str = "default") -> dict:
-    """Analyze a stock using the agent."""
+async def analyze_stock(symbol: str, session_id: Optional[str] = "default",
+                        query: Optional[str] = None) -> dict:
+    """
+    Analyze a stock, optionally with the caller's own query.
+    
+    A bare symbol, or a query that is just "Analyze <TICKER> stock", takes
+    the fast path: one concurrent data fetch and one LLM call. Anything else
+    (or FAST_PATH=0) runs the full agent loop. Either way the exchange is
+    kept in the session's history.
+    """
     logger.info(f"Analyzing {symbol}...")
     
     try:
-        user_message = f"Analyze {symbol} stock comprehensively. Consider sentiment, price, and technical indicators."
+        user_message = query or f"Analyze {symbol} stock comprehensively. Consider sentiment, price, and technical indicators."
+        
+        # Decided by the request alone; session bookkeeping is separate
+        if query is None:
+            fast_symbol = symbol
+        else:
+            match = _FAST_PATH_RE.fullmatch(query)
+            fast_symbol = match.group("symbol") if match else None
+        
+        if fast_symbol and os.getenv("FAST_PATH", "1") != "0":
+            result = await _fast_path_analysis(fast_symbol)
+            await _record_turn(session_id, user_message, result["messages"][-1])
+            logger.info(f"Analysis complete for {symbol} (fast path)")
+            return result
         
         config = {"configurable": {"thread_id": session_id}} if session_id else {}
         
-        result = await agent_with_memory.ainvoke(
+        result = await get_agent().ainvoke(
             {
                 "messages": [
                     {
@@ -264,17 +671,82 @@ async def analyze_stock(symbol: str, session_id: str = "default") -> dict:
         logger.error(f"Analysis failed: {e}")
         return {"error": str(e), "symbol": symbol}
 
+async def analyze_stocks(symbols: list[str], session_id: str = "default") -> list[dict]:
+    """
+    Analyze several stocks concurrently.
+    
+    At most MAX_CONCURRENCY analyses run at once; provider rate limits
+    are enforced separately per API.
+    """
+    semaphore = asyncio.Semaphore(int(os.getenv("MAX_CONCURRENCY", 8)))
+    
+    async def analyze_one(symbol: str) -> dict:
+        async with semaphore:
+            return await analyze_stock(symbol, session_id=f"{session_id}_{symbol}")
+    
+    return await asyncio.gather(*(analyze_one(symbol) for symbol in symbols))
+
+# === Server Mode (Optional) ===
+
+def create_app():
+    """
+    Build a FastAPI app that serves analyses from one warm agent.
+    
+    The agent graph, tool schemas, Redis pool, and HTTP session are built
+    once at startup and reused by every request.
+    """
+    from fastapi import FastAPI
+    
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        await init_response_cache()
+        get_agent()
+        yield
+        await close_http_session()
+    
+    app = FastAPI(title="stock_sentiment_agent", lifespan=lifespan)
+    
+    @app.post("/analyze")
+    async def analyze(symbol: str, session_id: Optional[str] = "default",
+                      query: Optional[str] = None) -> dict:
+        return await analyze_stock(symbol, session_id=session_id, query=query)
+    
+    @app.post("/analyze/batch")
+    async def analyze_batch(symbols: list[str], session_id: str = "default") -> list[dict]:
+        return await analyze_stocks(symbols, session_id=session_id)
+    
+    return app
+
+def serve(host: str = "127.0.0.1", port: int = 8000) -> None:
+    """Run the API server (uvicorn picks uvloop automatically when installed)."""
+    import uvicorn
+    
+    uvicorn.run(create_app(), host=host, port=port)
+
 if __name__ == "__main__":
-    # Get stock symbol from command line or use default
-    symbol = sys.argv[1] if len(sys.argv) > 1 else "AAPL"
-    session = os.getenv("SESSION_ID", f"session_{symbol}")
+    # Long-running service: python example_agent.py serve
+    if sys.argv[1:2] == ["serve"]:
+        serve(host=os.getenv("HOST", "127.0.0.1"), port=int(os.getenv("PORT", 8000)))
+        sys.exit(0)
+    
+    # Get stock symbols from command line or use default
+    symbols = sys.argv[1:] or ["AAPL"]
+    session = os.getenv("SESSION_ID", "session")
+    
+    async def main() -> list[dict]:
+        await init_response_cache()
+        try:
+            return await analyze_stocks(symbols, session_id=session)
+        finally:
+            await close_http_session()
     
     # Run analysis
-    result = asyncio.run(analyze_stock(symbol, session_id=session))
-    
-    # Pretty print result
-    print("\n" + "="*60)
-    print(f"ANALYSIS RESULT FOR {symbol.upper()}")
-    print("="*60)
-    print(json.dumps(result, indent=2, default=str))
-    print("="*60 + "\n")
+    results = asyncio.run(main())
+    
+    # Pretty print results
+    for symbol, result in zip(symbols, results):
+        print("\n" + "="*60)
+        print(f"ANALYSIS RESULT FOR {symbol.upper()}")
+        print("="*60)
+        _json_print(result)
+        print("="*60 + "\n")
@@ -3,35 +3,100 @@
 DeepAgent Generation Orchestrator
 
 Transforms natural language descriptions into production-ready DeepAgents with planning.
+Requires jinja2.
 """
 
 import json
+import logging
+import multiprocessing
+import os
 import re
-from dataclasses import dataclass
-from typing import Optional
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import NamedTuple, Optional
 from datetime import datetime
+from pathlib import Path
+
+from jinja2 import DictLoader, Environment, FunctionLoader
+
+logger = logging.getLogger(__name__)
 
-# Jinja2 template for DeepAgent generation (planning-focused)
+_SANITIZE_RE = re.compile(r'[^a-zA-Z0-9_]')
+# ASCII fast path for _SANITIZE_RE: spaces become "_", other disallowed characters are dropped
+_SANITIZE_TABLE = str.maketrans(
+    {" ": "_"} | {chr(c): None for c in range(128) if not (chr(c).isalnum() or chr(c) in " _")}
+)
+
+# Requirements are derived from the generated code's own imports
+_IMPORT_RE = re.compile(r"^\s*(?:from|import)\s+([\w.]+)", re.MULTILINE)
+
+_PKG_MAPPING = {
+    "langgraph": "langgraph>=0.1.0",
+    "langchain": "langchain>=0.3.0",
+    # 0.3.36 accepts JSON-schema dicts as tool args_schema
+    "langchain_core": "langchain-core>=0.3.36",
+    "langchain_community": "langchain-community>=0.3.0",
+    "pydantic": "pydantic>=2.0.0",
+    "redis": "redis>=5.0.0",
+    "psycopg": "psycopg[binary]>=3.1.0",
+    "psycopg_pool": "psycopg-pool>=3.2.0",
+    "msgspec": "msgspec>=0.18.0",
+    "uvloop": 'uvloop>=0.19; platform_system != "Windows"',
+}
+
+# Drivers loaded indirectly by a memory backend, so never imported by name
+_BACKEND_REQUIREMENTS = {
+    "postgres": ("langgraph-checkpoint-postgres>=2.0.0",),
+}
+
+# Jinja2 template for DeepAgent generation (planning-focused).
+# Memory-backend branches use <% %> tags and are resolved once per backend
+# (see _specialize), so a render only evaluates the tool/model parts.
 AGENT_TEMPLATE = '''#!/usr/bin/env python3
 """{{ agent_name }} - Generated DeepAgent {{ timestamp }}"""
 
 import os
 import sys
+import json
 import logging
 from typing import Optional, List
 import asyncio
+{% set cacheable_tools = tools | selectattr("cacheable") | list %}
+<% if memory_backend == 'postgres' %>
+{% if cacheable_tools %}
+from functools import lru_cache
+{% endif %}
+<% else %>
+from functools import cache{% if cacheable_tools %}, lru_cache{% endif %}
+
+<% endif %>
 
-from langgraph.prebuilt import create_deep_agent
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
-{% if memory_backend == 'redis' %}
+{% if tools | rejectattr("simple") | list %}
+from typing import Annotated
+import msgspec
+{% endif %}
+<% if memory_backend == 'redis' %>
 from langchain_community.chat_message_histories import RedisChatMessageHistory
+from langchain_core.messages import message_to_dict
 import redis
-{% elif memory_backend == 'postgres' %}
-from langgraph.checkpoint.postgres import PostgresSaver
-{% else %}
+<% elif memory_backend == 'postgres' %>
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+<% else %>
 from langgraph.checkpoint.memory import InMemorySaver
-{% endif %}
+<% endif %>
+
+# libuv event loop when available (not on Windows)
+try:
+    import uvloop
+    _run_async = uvloop.run
+except ImportError:
+    _run_async = asyncio.run
 
 # === Logging Configuration ===
 logging.basicConfig(
@@ -100,21 +165,61 @@ def evaluate_solution(solution: str, criteria: List[str]) -> str:
         return f"Error evaluating solution: {str(e)}"
 
 # === User-Defined Tools ===
+{% if tools | rejectattr("simple") | list %}
+# Tools with non-primitive arguments are validated by msgspec instead of Pydantic
+def _struct_schema(struct: type) -> dict:
+    """JSON schema for a msgspec Struct, in the form LangChain takes as args_schema."""
+    _, components = msgspec.json.schema_components([struct])
+    return components[struct.__name__]
+
+{% endif %}
 {% for tool in tools %}
-class {{ tool['class_name'] }}(BaseModel):
-{% for param in tool['parameters'] %}
-    {{ param['name'] }}: {{ param['type'] }} = Field(
-        {% if param['default'] %}default={{ param['default'] }}, {% endif %}
-        description="{{ param['description'] }}"
-    )
+{% if tool.simple %}
+# Primitive arguments only: a JSON schema skips per-call Pydantic validation
+{{ tool.class_name }} = {
+    "type": "object",
+    "properties": {
+{% for param in tool.parameters %}
+        "{{ param.name }}": {
+            "type": "{{ json_types[param.type] }}",
+            "description": "{{ param.description }}",
+{% if param.default %}
+            "default": {{ param.default }},
+{% endif %}
+        },
 {% endfor %}
+    },
+    "required": {{ tool.parameters | rejectattr("default") | map(attribute="name") | list | tojson }},
+}
+{% else %}
+class {{ tool.class_name }}(msgspec.Struct, kw_only=True, frozen=True):
+{% for param in tool.parameters %}
+    {{ param.name }}: Annotated[{{ param.type }}, msgspec.Meta(description="{{ param.description }}")]{% if param.default %} = {{ param.default }}{% endif %}
 
-@tool(args_schema={{ tool['class_name'] }})
-def {{ tool['func_name'] }}({{ tool['params_str'] }}) -> str:
-    """{{ tool['description'] }}"""
+{% endfor %}
+{% endif %}
+
+{% if tool.cacheable %}
+# Cached per argument set; exceptions propagate and are never cached
+@lru_cache(maxsize=256)
+def _{{ tool.func_name }}_result({{ tool.params_str }}) -> str:
+    return "Result from {{ tool.func_name }}"
+
+{% endif %}
+@tool(args_schema={% if tool.simple %}{{ tool.class_name }}{% else %}_struct_schema({{ tool.class_name }}){% endif %})
+def {{ tool.func_name }}({{ tool.signature }}) -> str:
+    """{{ tool.description }}"""
     try:
-        logger.info(f"Tool called: {{ tool['func_name'] }} with args: {locals()}")
-        return f"Result from {{ tool['func_name'] }}"
+{% if not tool.simple %}
+        ({{ tool.params_str_names }},) = msgspec.structs.astuple(msgspec.convert(kwargs, {{ tool.class_name }}))
+{% endif %}
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Tool called: %s args=%r", "{{ tool.func_name }}", ({{ tool.params_str_names }}{% if tool.parameters | length == 1 %},{% endif %}))
+{% if tool.cacheable %}
+        return _{{ tool.func_name }}_result({{ tool.params_str_names }})
+{% else %}
+        return "Result from {{ tool.func_name }}"
+{% endif %}
     except KeyError as e:
         logger.error(f"Missing API key: {e}")
         return f"Error: Set environment variable {str(e)}"
@@ -123,16 +228,51 @@ def {{ tool['func_name'] }}({{ tool['params_str'] }}) -> str:
         return f"Error: {str(e)}"
 
 {% endfor %}
+{% set parallel_tools = tools | selectattr("parallel_safe") | list %}
+{% if parallel_tools %}
+# === Parallel Tool Dispatch ===
+# Side-effect-free tools the agent may fan out in a single step
+_PARALLEL_TOOLS = {
+{% for tool in parallel_tools %}
+    "{{ tool.func_name }}": {{ tool.func_name }},
+{% endfor %}
+}
+
+class ToolCall(BaseModel):
+    name: str = Field(description="Tool name: {{ parallel_tools | map(attribute='func_name') | join(', ') }}")
+    args: dict = Field(description="Arguments for the tool")
+
+class ParallelCallsInput(BaseModel):
+    calls: List[ToolCall] = Field(description="Independent tool calls to run concurrently")
+
+@tool(args_schema=ParallelCallsInput)
+async def run_tools_in_parallel(calls: List[ToolCall]) -> List[str]:
+    """Run several independent tool calls concurrently and return their results in order."""
+    async def _call(call: ToolCall) -> str:
+        selected = _PARALLEL_TOOLS.get(call.name)
+        if selected is None:
+            return f"Error: {call.name} cannot run in parallel"
+        try:
+            return await selected.ainvoke(call.args)
+        except Exception as e:
+            logger.error(f"Parallel tool error: {call.name}: {e}")
+            return f"Error: {str(e)}"
+    
+    return await asyncio.gather(*(_call(c) for c in calls))
+
+{% endif %}
 
 # === Memory Configuration ===
-{% if memory_backend == 'redis' %}
+<% if memory_backend == 'redis' %>
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
 def init_redis_memory(agent_id: str = "default"):
     """Initialize Redis for long-running research sessions."""
     try:
+        # Raw bytes: RedisChatMessageHistory decodes stored messages itself
         pool = redis.ConnectionPool.from_url(
-            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
-            max_connections=10,
-            decode_responses=True
+            REDIS_URL,
+            max_connections=int(os.getenv("REDIS_POOL_SIZE", "10"))
         )
         redis_client = redis.Redis(connection_pool=pool)
         redis_client.ping()
@@ -143,42 +283,102 @@ def init_redis_memory(agent_id: str = "default"):
         return None
     return redis_client
 
-memory_client = init_redis_memory()
+_memory_client: Optional[redis.Redis] = None
 
-{% elif memory_backend == 'postgres' %}
-def init_postgres_memory():
+def get_memory_client():
+    """Shared pooled Redis client, connected on first use (retried while unavailable)."""
+    global _memory_client
+    if _memory_client is None:
+        _memory_client = init_redis_memory()
+    return _memory_client
+
+class PipelinedRedisHistory(RedisChatMessageHistory):
+    """Appends a turn's messages and refreshes the TTL in one round trip."""
+    
+    def add_messages(self, messages) -> None:
+        # LPUSH like add_message, so the stored order is unchanged
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            for message in messages:
+                pipe.lpush(self.key, json.dumps(message_to_dict(message)))
+            if self.ttl:
+                pipe.expire(self.key, self.ttl)
+            pipe.execute()
+
+def get_history(session_id: str) -> Optional[PipelinedRedisHistory]:
+    """Chat history for a session on the shared pooled client, or None without Redis."""
+    memory_client = get_memory_client()
+    if memory_client is None:
+        return None
+    history = PipelinedRedisHistory(
+        session_id=session_id,
+        url=REDIS_URL,
+        key_prefix="agent:memory:",
+        ttl=int(os.getenv("SESSION_TTL", 3600))
+    )
+    # redis-py connects lazily, so the client built from url= never opens a
+    # socket once it is swapped for the pooled one
+    history.redis_client = memory_client
+    return history
+
+<% elif memory_backend == 'postgres' %>
+_pg_pool: Optional[AsyncConnectionPool] = None
+
+async def init_postgres_memory():
     """Initialize PostgreSQL checkpointer for long-running agents."""
+    global _pg_pool
     db_url = os.getenv("DATABASE_URL")
     if not db_url:
         raise ValueError("DATABASE_URL not set for PostgreSQL memory")
     
-    checkpointer = PostgresSaver.from_conn_string(db_url)
+    # Opened inside the running event loop; checkpoint writes share the pool
+    # instead of serializing on a single connection
+    _pg_pool = AsyncConnectionPool(
+        conninfo=db_url,
+        min_size=2,
+        max_size=int(os.getenv("PG_POOL_MAX", "10")),
+        open=False,
+        kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row}
+    )
+    await _pg_pool.open()
+    checkpointer = AsyncPostgresSaver(_pg_pool)
+    await checkpointer.setup()
     logger.info("PostgreSQL checkpointer initialized")
     return checkpointer
 
-checkpointer = init_postgres_memory()
+async def close_postgres_memory():
+    """Close the PostgreSQL pool opened by init_postgres_memory."""
+    if _pg_pool is not None:
+        await _pg_pool.close()
 
-{% else %}
+<% else %>
 from langgraph.checkpoint.memory import InMemorySaver
 checkpointer = InMemorySaver()
 logger.warning("Using in-memory checkpointer - state lost on restart")
 
-{% endif %}
+<% endif %>
 
 # === DeepAgent Setup ===
 planning_tools = [create_plan, refine_plan, decompose_task, evaluate_solution]
 
 all_tools = [
 {% for tool in tools %}
-    {{ tool['func_name'] }},
+    {{ tool.func_name }},
 {% endfor %}
+{% if parallel_tools %}
+    run_tools_in_parallel,
+{% endif %}
 ] + planning_tools
 
-# Create DeepAgent with planning capabilities
-agent = create_deep_agent(
-    model="{{ model }}",
-    tools=all_tools,
-    system_prompt="""{{ system_prompt }}
+def build_agent(checkpointer=None):
+    """Create DeepAgent with planning capabilities."""
+    # Imported here so importing this module does not load LangGraph
+    from langgraph.prebuilt import create_deep_agent
+    
+    return create_deep_agent(
+        model="{{ model }}",
+        tools=all_tools,
+        checkpointer=checkpointer,
+        system_prompt="""{{ system_prompt }}
     
 You are a DeepAgent with planning capabilities. For complex tasks:
 1. Create a plan using create_plan()
@@ -187,8 +387,31 @@ You are a DeepAgent with planning capabilities. For complex tasks:
 4. Refine based on feedback using refine_plan()
 
 Always plan before acting. Iterate and improve.""",
-    max_iterations=15,
-)
+        max_iterations=15,
+    )
+
+<% if memory_backend == 'postgres' %>
+_agent = None
+_agent_lock = asyncio.Lock()
+
+async def get_agent():
+    """Build the agent once the async PostgreSQL checkpointer is ready."""
+    global _agent
+    async with _agent_lock:
+        if _agent is None:
+            _agent = build_agent(await init_postgres_memory())
+    return _agent
+<% elif memory_backend == 'redis' %>
+@cache
+def get_agent():
+    """Build the agent on first use so importing this module stays cheap."""
+    return build_agent()
+<% else %>
+@cache
+def get_agent():
+    """Build the agent on first use so importing this module stays cheap."""
+    return build_agent(checkpointer)
+<% endif %>
 
 # === Main Execution ===
 async def run_agent(user_input: str, session_id: str = "default"):
@@ -198,10 +421,28 @@ async def run_agent(user_input: str, session_id: str = "default"):
     try:
         config = {"configurable": {"thread_id": session_id}} if session_id else {}
         
+<% if memory_backend == 'postgres' %>
+        agent = await get_agent()
+<% else %>
+        agent = get_agent()
+<% endif %>
+<% if memory_backend == 'redis' %>
+        # Earlier turns are replayed from Redis; this turn's messages are
+        # appended afterwards in a single pipelined round trip
+        history = get_history(session_id) if session_id else None
+        past = await asyncio.to_thread(lambda: history.messages) if history is not None else []
+        result = await agent.ainvoke(
+            {"messages": [*past, {"role": "user", "content": user_input}]},
+            config=config
+        )
+        if history is not None:
+            await asyncio.to_thread(history.add_messages, result["messages"][len(past):])
+<% else %>
         result = await agent.ainvoke(
             {"messages": [{"role": "user", "content": user_input}]},
             config=config
         )
+<% endif %>
         
         logger.info("DeepAgent completed successfully with iterative planning")
         return result
@@ -209,34 +450,131 @@ async def run_agent(user_input: str, session_id: str = "default"):
         logger.error(f"DeepAgent execution failed: {e}")
         return {"error": str(e)}
 
+<% if memory_backend == 'postgres' %>
+async def main(user_input: str, session_id: str = "default"):
+    """Run the agent, then release the PostgreSQL pool."""
+    try:
+        return await run_agent(user_input, session_id=session_id)
+    finally:
+        await close_postgres_memory()
+
+<% endif %>
 if __name__ == "__main__":
     user_query = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else "{{ initial_query }}"
     session = os.getenv("SESSION_ID", "default_session")
     
-    result = asyncio.run(run_agent(user_query, session_id=session))
-    print(json.dumps(result, indent=2, default=str))
+<% if memory_backend == 'postgres' %>
+    result = _run_async(main(user_query, session_id=session))
+<% else %>
+    result = _run_async(run_agent(user_query, session_id=session))
+<% endif %>
+    json.dump(result, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\\n")
 '''
 
-@dataclass
+MEMORY_BACKENDS = ("memory", "redis", "postgres")
+
+# Compiled once per process. The source is a module constant, so there is
+# nothing to auto-reload.
+_BACKEND_ENV = Environment(
+    loader=DictLoader({"agent.py.j2": AGENT_TEMPLATE}),
+    auto_reload=False,
+    block_start_string="<%",
+    block_end_string="%>",
+    variable_start_string="<<=",
+    variable_end_string="=>>",
+    comment_start_string="<#",
+    comment_end_string="#>",
+    keep_trailing_newline=True,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+def _specialize(name: str) -> str:
+    """Template source for "<backend>.py.j2" with the memory branches inlined."""
+    backend = name.split(".", 1)[0]
+    return _BACKEND_ENV.get_template("agent.py.j2").render(memory_backend=backend)
+
+_ENV = Environment(
+    loader=FunctionLoader(_specialize),
+    auto_reload=False,
+    keep_trailing_newline=True,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+# Primitive parameter types and their JSON schema names
+_JSON_TYPES = {"str": "string", "int": "integer", "float": "number", "bool": "boolean"}
+
+# Parameter types lru_cache cannot key on, found anywhere in the annotation
+# (e.g. Optional[List[str]], tuple[list, ...])
+_UNHASHABLE_TYPE_RE = re.compile(r"\b(?:list|dict|set|sequence|mapping)\b", re.IGNORECASE)
+
+class ToolParameter(NamedTuple):
+    """Tool argument definition."""
+    name: str
+    type: str
+    description: str
+    default: Optional[str] = None
+
+@dataclass(slots=True, frozen=True)
 class Tool:
     """Tool definition."""
     name: str
     description: str
-    parameters: list[dict]
-    
-    @property
-    def func_name(self) -> str:
-        return self.name.lower().replace(" ", "_").replace("-", "_")
-    
-    @property
-    def class_name(self) -> str:
-        return "".join(word.capitalize() for word in self.name.split()) + "Input"
+    parameters: tuple[ToolParameter, ...]
+    # Side-effect-free tools can be fanned out by run_tools_in_parallel
+    parallel_safe: bool = False
+    # Pure tools with hashable arguments get an lru_cache over their result
+    cacheable: bool = False
+    # Derived names, computed once in __post_init__
+    func_name: str = field(init=False, repr=False, compare=False)
+    class_name: str = field(init=False, repr=False, compare=False)
+    params_str: str = field(init=False, repr=False, compare=False)
+    params_str_names: str = field(init=False, repr=False, compare=False)
+    # Primitive-only tools get a hand-written JSON schema and carry defaults in
+    # the signature; the rest are validated by a msgspec Struct in the body
+    simple: bool = field(init=False, repr=False, compare=False)
+    signature: str = field(init=False, repr=False, compare=False)
     
-    @property
-    def params_str(self) -> str:
-        return ", ".join(f"{p['name']}: {p['type']}" for p in self.parameters)
-
-@dataclass
+    def __post_init__(self):
+        # Accept plain dicts/lists; store an immutable tuple so Tool is hashable
+        parameters = tuple(
+            p if isinstance(p, ToolParameter) else ToolParameter(**p)
+            for p in self.parameters
+        )
+        object.__setattr__(self, "parameters", parameters)
+        object.__setattr__(self, "func_name",
+                           self.name.lower().replace(" ", "_").replace("-", "_"))
+        object.__setattr__(self, "class_name",
+                           "".join(word.capitalize() for word in self.name.split()) + "Input")
+        object.__setattr__(self, "params_str",
+                           ", ".join(f"{p.name}: {p.type}" for p in parameters))
+        object.__setattr__(self, "params_str_names", ", ".join(p.name for p in parameters))
+        
+        # The JSON schema path passes arguments through unvalidated, so defaults
+        # must live in the signature; a required parameter after a defaulted one
+        # cannot, and goes through the msgspec Struct like any non-primitive tool
+        defaults = [bool(p.default) for p in parameters]
+        simple = all(p.type in _JSON_TYPES for p in parameters) and defaults == sorted(defaults)
+        object.__setattr__(self, "simple", simple)
+        if simple:
+            signature = ", ".join(
+                f"{p.name}: {p.type} = {p.default}" if p.default else f"{p.name}: {p.type}"
+                for p in parameters
+            )
+        else:
+            signature = "**kwargs"
+        object.__setattr__(self, "signature", signature)
+        
+        if self.cacheable:
+            unhashable = [p.name for p in parameters if _UNHASHABLE_TYPE_RE.search(p.type)]
+            if unhashable:
+                raise ValueError(
+                    f"Tool '{self.name}' is cacheable but has unhashable parameters: {', '.join(unhashable)}"
+                )
+
+@dataclass(slots=True, frozen=True)
 class AgentGenerationRequest:
     """Agent generation request."""
     description: str
@@ -258,27 +596,30 @@ class DeepAgentGenerator:
                 description="Search the web for information",
                 parameters=[
                     {"name": "query", "type": "str", "description": "Search query"}
-                ]
+                ],
+                parallel_safe=True
             ),
             Tool(
                 name="Data Analyzer",
                 description="Analyze data structures and patterns",
                 parameters=[
                     {"name": "data", "type": "str", "description": "Data to analyze"}
-                ]
+                ],
+                parallel_safe=True
             ),
         ]
     
     def generate(self, req: AgentGenerationRequest) -> dict:
         """Generate a DeepAgent from a request."""
-        logger.info(f"Generating DeepAgent for: {req.description}")
+        logger.info("Generating DeepAgent for: %s", req.description)
         
-        tools = req.tools or self._default_tools()
+        tools = req.tools or self.tools
         
         template_vars = {
             "agent_name": self._sanitize_name(req.description),
             "description": req.description,
-            "tools": [self._tool_to_dict(t) for t in tools],
+            "tools": tools,
+            "json_types": _JSON_TYPES,
             "memory_backend": req.memory_backend,
             "model": req.model,
             "system_prompt": self._create_system_prompt(req.description),
@@ -287,7 +628,7 @@ class DeepAgentGenerator:
         }
         
         agent_code = self._render_template(template_vars)
-        requirements = self._extract_requirements(req)
+        requirements = self._extract_requirements(req, agent_code)
         
         return {
             "agent_code": agent_code,
@@ -297,20 +638,12 @@ class DeepAgentGenerator:
     
     def _sanitize_name(self, description: str) -> str:
         """Create a valid Python name from description."""
-        name = re.sub(r'[^a-zA-Z0-9_]', '', description.replace(" ", "_"))[:50]
+        name = description.translate(_SANITIZE_TABLE)
+        if not name.isascii():
+            name = _SANITIZE_RE.sub('', name)
+        name = name[:50]
         return f"DeepAgent_{name}" if name else "DeepAgent"
     
-    def _tool_to_dict(self, tool: Tool) -> dict:
-        """Convert Tool to template dict."""
-        return {
-            "name": tool.name,
-            "func_name": tool.func_name,
-            "class_name": tool.class_name,
-            "description": tool.description,
-            "parameters": tool.parameters,
-            "params_str": tool.params_str,
-        }
-    
     def _create_system_prompt(self, description: str) -> str:
         """Create system prompt for the agent."""
         return f"""You are a DeepAgent specialized in: {description}
@@ -323,63 +656,68 @@ Your approach:
 5. Provide clear, actionable results"""
     
     def _render_template(self, vars: dict) -> str:
-        """Render Jinja2 template (simplified without Jinja2 dep)."""
-        code = AGENT_TEMPLATE
-        
-        # Simple variable substitution
-        for key, value in vars.items():
-            if key not in ["tools"]:
-                code = code.replace("{{ " + key + " }}", str(value))
-        
-        # Handle tools loop
-        tool_code = ""
-        for tool in vars.get("tools", []):
-            param_schema = "".join(
-                f'    {p["name"]}: {p["type"]} = Field(description="{p["description"]}")\n'
-                for p in tool.get("parameters", [])
-            )
-            tool_code += f'''
-class {tool['class_name']}(BaseModel):
-{param_schema}
-
-@tool(args_schema={tool['class_name']})
-def {tool['func_name']}({tool['params_str']}) -> str:
-    """{tool['description']}"""
-    try:
-        logger.info(f"Tool called: {tool['func_name']} with args: {{locals()}}")
-        return f"Result from {tool['func_name']}"
-    except KeyError as e:
-        logger.error(f"Missing API key: {{e}}")
-        return f"Error: Set environment variable {{str(e)}}"
-    except Exception as e:
-        logger.error(f"Tool error: {{type(e).__name__}}: {{e}}")
-        return f"Error: {{str(e)}}"
-'''
-        
-        code = re.sub(
-            r'{%\s*for tool in tools\s*%\}.*?{%\s*endfor\s*%\}',
-            tool_code,
-            code,
-            flags=re.DOTALL
-        )
-        
-        return code
+        """Render the compiled Jinja2 agent template."""
+        # Unknown backends keep the in-memory checkpointer, as before
+        backend = vars["memory_backend"] if vars["memory_backend"] in MEMORY_BACKENDS else "memory"
+        return _ENV.get_template(f"{backend}.py.j2").render(**vars)
     
-    def _extract_requirements(self, req: AgentGenerationRequest) -> list[str]:
-        """Extract dependencies based on request."""
-        reqs = [
-            "langgraph>=0.1.0",
-            "langchain>=0.3.0",
-            "langchain-core>=0.3.0",
-            "pydantic>=2.0.0",
-        ]
-        
-        if req.memory_backend == "redis":
-            reqs.append("redis>=5.0.0")
-        elif req.memory_backend == "postgres":
-            reqs.append("psycopg2-binary>=2.9.0")
-        
-        return reqs
+    def _extract_requirements(self, req: AgentGenerationRequest, agent_code: str) -> list[str]:
+        """Extract dependencies from the generated code's imports."""
+        modules = {m.partition(".")[0] for m in _IMPORT_RE.findall(agent_code)}
+        reqs = [_PKG_MAPPING[m] for m in sorted(modules) if m in _PKG_MAPPING]
+        reqs.extend(_BACKEND_REQUIREMENTS.get(req.memory_backend, ()))
+        # A backend extra may also be reached through an import; keep the first
+        return list(dict.fromkeys(reqs))
+
+# === Template Installation ===
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+# Helper modules the templates import, shipped next to every installed template
+_TEMPLATE_SUPPORT_FILES = ("_toolkit.py",)
+
+def install_template(name: str, output_dir: str) -> Path:
+    """Copy templates/<name>_template.py and its helper modules into output_dir."""
+    source = TEMPLATES_DIR / f"{name}_template.py"
+    if not source.exists():
+        raise ValueError(f"Unknown template: {name}")
+    
+    target_dir = Path(output_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for support_file in _TEMPLATE_SUPPORT_FILES:
+        shutil.copy2(TEMPLATES_DIR / support_file, target_dir / support_file)
+    return Path(shutil.copy2(source, target_dir / source.name))
+
+# === Batch Generation ===
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_WORKER_GENERATOR: Optional[DeepAgentGenerator] = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Process pool for batch generation, created on first use and kept warm."""
+    global _POOL
+    if _POOL is None:
+        # Compile every backend template first so forked workers inherit them
+        # (fork is Linux only; it is unsafe on macOS and unavailable on Windows)
+        for backend in MEMORY_BACKENDS:
+            _ENV.get_template(f"{backend}.py.j2")
+        context = multiprocessing.get_context("fork") if sys.platform.startswith("linux") else None
+        _POOL = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=context)
+    return _POOL
+
+def _generate_one(req: AgentGenerationRequest) -> dict:
+    global _WORKER_GENERATOR
+    if _WORKER_GENERATOR is None:
+        _WORKER_GENERATOR = DeepAgentGenerator()
+    return _WORKER_GENERATOR.generate(req)
+
+def generate_many(requests: list[AgentGenerationRequest]) -> list[dict]:
+    """Generate many agents in parallel across worker processes, in request order."""
+    workers = os.cpu_count() or 1
+    if len(requests) < 2 or workers < 2:
+        return [_generate_one(req) for req in requests]
+    chunksize = max(1, len(requests) // (4 * workers))
+    return list(_get_pool().map(_generate_one, requests, chunksize=chunksize))
 
 if __name__ == "__main__":
     generator = DeepAgentGenerator()
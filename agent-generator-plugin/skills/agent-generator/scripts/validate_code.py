@@ -9,11 +9,43 @@ Ensures generated code is:
 """
 
 import ast
+import asyncio
+import hashlib
+import multiprocessing
+import os
 import sys
-from typing import Tuple, List
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple, List
 from dataclasses import dataclass
 
-@dataclass
+# Forbidden function calls at module level. Identifiers in the AST are
+# interned by the parser, so interning these makes lookups pointer-compares.
+FORBIDDEN_CALLS = frozenset(map(sys.intern, (
+    'eval', 'exec', 'compile', '__import__',
+    'open', 'file', 'input', 'raw_input',
+    'system', 'popen', 'subprocess',
+)))
+
+# Allowed import modules (packages)
+ALLOWED_IMPORTS = frozenset(map(sys.intern, (
+    'langgraph', 'langchain', 'langchain_core', 'langchain_community',
+    'pydantic', 'deepagents',
+    'json', 'os', 'sys', 'asyncio', 'logging', 'typing',
+    'datetime', 'dataclasses', 'functools', 'itertools', 'random',
+    'collections', 'contextlib', 're', 'time', 'zoneinfo', 'hashlib',
+    'pathlib', 'tempfile', 'shutil',
+    'requests', 'aiohttp', 'httpx', 'aiolimiter', 'redis', 'orjson',
+    'psycopg', 'psycopg_pool', 'uvloop', 'msgspec',
+    'tenacity', 'dotenv',
+    'fastapi', 'uvicorn',
+    '_toolkit',
+)))
+
+# Assignment targets that should never hold a string literal
+SECRET_NAME_SUFFIXES = ('api_key', 'token', 'password')
+
+@dataclass(slots=True, frozen=True)
 class ValidationResult:
     """Result of code validation."""
     valid: bool
@@ -21,84 +53,126 @@ class ValidationResult:
     warnings: List[str]
     imports_found: List[str]
 
-class SecurityValidator(ast.NodeVisitor):
+def _issue_line(issue: str) -> int:
+    """Line number of a "Line <n>: ..." issue message."""
+    return int(issue[len("Line "):issue.index(":")])
+
+class SecurityValidator:
     """Validates code for security issues."""
     
-    # Forbidden function calls at module level
-    FORBIDDEN_CALLS = {
-        'eval', 'exec', 'compile', '__import__',
-        'open', 'file', 'input', 'raw_input',
-        'system', 'popen', 'subprocess',
-    }
-    
-    # Allowed import modules (packages)
-    ALLOWED_IMPORTS = {
-        'langgraph', 'langchain', 'langchain_core', 'langchain_community',
-        'pydantic', 'deepagents',
-        'json', 'os', 'sys', 'asyncio', 'logging', 'typing',
-        'datetime', 'dataclasses', 'functools', 'itertools',
-        'pathlib', 'tempfile', 'shutil',
-        'requests', 'aiohttp', 'redis',
-        'tenacity', 'dotenv',
-    }
-    
     def __init__(self):
         self.errors = []
         self.warnings = []
         self.imports = []
-        self.in_function_def = False
-        self.depth = 0
+        self._main_guard_nodes = set()
+    
+    def scan(self, tree: ast.AST):
+        """Walk every node once, dispatching only the node types we check."""
+        self._main_guard_nodes = self._collect_main_guard(tree)
+        
+        for node in ast.walk(tree):
+            node_type = type(node)
+            if node_type is ast.Call:
+                self._check_call(node)
+            elif node_type is ast.Import:
+                self._check_import(node)
+            elif node_type is ast.ImportFrom:
+                self._check_import_from(node)
+            elif node_type is ast.Assign or node_type is ast.AnnAssign:
+                self._check_secret_assign(node)
+        
+        # ast.walk is breadth-first; report issues in source-line order
+        self.errors.sort(key=_issue_line)
+        self.warnings.sort(key=_issue_line)
     
-    def visit_Call(self, node: ast.Call):
+    @staticmethod
+    def _collect_main_guard(tree: ast.AST) -> set:
+        """Return ids of nodes under a top-level `if __name__ == "__main__":`."""
+        guarded = set()
+        for stmt in getattr(tree, 'body', []):
+            test = getattr(stmt, 'test', None)
+            if (
+                isinstance(stmt, ast.If)
+                and isinstance(test, ast.Compare)
+                and isinstance(test.left, ast.Name)
+                and test.left.id == '__name__'
+            ):
+                guarded.update(id(n) for n in ast.walk(stmt))
+        return guarded
+    
+    def _check_call(self, node: ast.Call):
         """Check function calls."""
         if isinstance(node.func, ast.Name):
             # Only block bare function calls (not methods)
-            if node.func.id in self.FORBIDDEN_CALLS:
+            if node.func.id in FORBIDDEN_CALLS:
                 self.errors.append(
                     f"Line {node.lineno}: Forbidden function call: {node.func.id}"
                 )
+            # CLI output under the __main__ guard is fine
+            elif node.func.id == 'print' and id(node) not in self._main_guard_nodes:
+                self.warnings.append(
+                    f"Line {node.lineno}: Use logging instead of print() for production code"
+                )
         # Note: Don't block method calls (e.g., agent.compile()) - these are safe
+    
+    def _check_secret_assign(self, node):
+        """Flag string literals assigned to secret-looking names."""
+        value = node.value
+        if not (isinstance(value, ast.Constant) and isinstance(value.value, str)):
+            return
         
-        self.generic_visit(node)
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        for target in targets:
+            name = target.id if isinstance(target, ast.Name) else getattr(target, 'attr', '')
+            if name.lower().endswith(SECRET_NAME_SUFFIXES):
+                self.warnings.append(
+                    f"Line {node.lineno}: Potential hardcoded secret detected. Use os.getenv() instead."
+                )
+                break
     
-    def visit_Import(self, node: ast.Import):
+    def _check_import(self, node: ast.Import):
         """Check import statements."""
         for alias in node.names:
             module = alias.name.split('.')[0]
             self.imports.append(alias.name)
             
-            if module not in self.ALLOWED_IMPORTS:
+            if module not in ALLOWED_IMPORTS:
                 self.errors.append(
                     f"Line {node.lineno}: Unauthorized import: {alias.name}"
                 )
-        
-        self.generic_visit(node)
     
-    def visit_ImportFrom(self, node: ast.ImportFrom):
+    def _check_import_from(self, node: ast.ImportFrom):
         """Check from...import statements."""
         if node.module:
             module = node.module.split('.')[0]
             self.imports.append(node.module)
             
-            if module not in self.ALLOWED_IMPORTS:
+            if module not in ALLOWED_IMPORTS:
                 self.errors.append(
                     f"Line {node.lineno}: Unauthorized import from: {node.module}"
                 )
-        
-        self.generic_visit(node)
+
+# Parsed trees keyed by a blake2b digest of the source, so the cache does not
+# keep the source strings themselves alive
+_PARSE_CACHE: "OrderedDict[bytes, ast.AST]" = OrderedDict()
+_PARSE_CACHE_SIZE = 64
+
+def _parse_cached(code: str) -> ast.AST:
+    """
+    Parse code once per distinct source; validate -> fix -> validate loops hit the cache.
     
-    def visit_FunctionDef(self, node: ast.FunctionDef):
-        """Track function definitions."""
-        old_in_func = self.in_function_def
-        self.in_function_def = True
-        
-        self.generic_visit(node)
-        
-        self.in_function_def = old_in_func
+    The returned tree is shared between callers and must not be mutated.
+    """
+    key = hashlib.blake2b(code.encode()).digest()
+    tree = _PARSE_CACHE.get(key)
+    if tree is not None:
+        _PARSE_CACHE.move_to_end(key)
+        return tree
     
-    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
-        """Track async function definitions."""
-        self.visit_FunctionDef(node)
+    tree = _PARSE_CACHE[key] = ast.parse(code)
+    if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE:
+        _PARSE_CACHE.popitem(last=False)
+    return tree
 
 def validate_python_code(code: str) -> ValidationResult:
     """
@@ -113,7 +187,7 @@ def validate_python_code(code: str) -> ValidationResult:
     
     # 1. Syntax validation
     try:
-        tree = ast.parse(code)
+        tree = _parse_cached(code)
     except SyntaxError as e:
         return ValidationResult(
             valid=False,
@@ -124,33 +198,12 @@ def validate_python_code(code: str) -> ValidationResult:
     
     # 2. Security validation
     validator = SecurityValidator()
-    validator.visit(tree)
+    validator.scan(tree)
     
     errors.extend(validator.errors)
     warnings.extend(validator.warnings)
     imports = validator.imports
     
-    # 3. Code quality checks
-    lines = code.split("\n")
-    
-    # Check for hardcoded API keys
-    for i, line in enumerate(lines, 1):
-        if any(key in line for key in ['api_key = "', 'token = "', 'password = "']):
-            if not any(substring in line for substring in ['os.getenv', 'environ.get']):
-                warnings.append(
-                    f"Line {i}: Potential hardcoded secret detected. Use os.getenv() instead."
-                )
-    
-    # Check for print instead of logging
-    for i, line in enumerate(lines, 1):
-        stripped = line.strip()
-        if stripped.startswith('print(') and not any(
-            exclude in line for exclude in ['logging', '__name__', 'argparse']
-        ):
-            warnings.append(
-                f"Line {i}: Use logging instead of print() for production code"
-            )
-    
     # Check imports are present
     if not imports:
         warnings.append("No imports detected - code may be incomplete")
@@ -165,6 +218,26 @@ def validate_python_code(code: str) -> ValidationResult:
         imports_found=imports
     )
 
+_POOL: Optional[ProcessPoolExecutor] = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Process pool for batch validation, created on first use and kept warm."""
+    global _POOL
+    if _POOL is None:
+        # fork lets workers inherit this already-imported module (Linux only;
+        # fork is unsafe on macOS and unavailable on Windows)
+        context = multiprocessing.get_context("fork") if sys.platform.startswith("linux") else None
+        _POOL = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=context)
+    return _POOL
+
+async def validate_many(codes: List[str]) -> List[ValidationResult]:
+    """Validate many generated agents in parallel without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    return await asyncio.gather(*(
+        loop.run_in_executor(pool, validate_python_code, code) for code in codes
+    ))
+
 def format_validation_report(result: ValidationResult) -> str:
     """Format validation result as readable report."""
     lines = []
@@ -0,0 +1,165 @@
+"""
+Shared helpers for the agent templates.
+
+make_stub_tool builds a LangChain tool from a plain render function and a
+field spec, so the templates don't each declare a Pydantic input class per tool.
+cached_ainvoke and cached_astream put an opt-in, exact-match response cache in front
+of agent.ainvoke / agent.astream.
+dumps and dump pretty-print results with orjson when it is installed.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+from langchain_core.tools import BaseTool, StructuredTool
+from pydantic import Field, create_model
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Input schemas keyed by (name, fields) so re-imports reuse the compiled model
+_SCHEMAS: Dict[tuple, type] = {}
+
+# Agent responses keyed by hash(system prompt, thread, query); opt in by
+# setting RESPONSE_CACHE_TTL to a positive number of seconds
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "0"))
+RESPONSE_CACHE_SIZE = 256
+_RESPONSES: Dict[Any, Tuple[float, Any]] = {}
+
+
+def _input_schema(name: str, fields: Dict[str, tuple]) -> type:
+    """Return the cached Pydantic input model for a tool, creating it once."""
+    key = (name, tuple((field, *spec) for field, spec in fields.items()))
+    schema = _SCHEMAS.get(key)
+    if schema is None:
+        definitions = {}
+        for field, spec in fields.items():
+            field_type, description, *default = spec
+            if default:
+                definitions[field] = (field_type, Field(default=default[0], description=description))
+            else:
+                definitions[field] = (field_type, Field(description=description))
+        model_name = "".join(part.title() for part in name.split("_")) + "Input"
+        schema = _SCHEMAS[key] = create_model(model_name, **definitions)
+    return schema
+
+
+def make_stub_tool(name: str, fields: Dict[str, Tuple], render: Callable[..., str],
+                   description: Optional[str] = None) -> BaseTool:
+    """
+    Build a structured tool from a render function.
+
+    `fields` maps argument name to (type, description) or
+    (type, description, default). The tool description defaults to the
+    render function's docstring.
+    """
+    return StructuredTool.from_function(
+        func=render,
+        name=name,
+        description=description or render.__doc__,
+        args_schema=_input_schema(name, fields),
+    )
+
+
+def _response_key(system_prompt: str, query: str, config: dict) -> str:
+    # The thread id keeps one session's answer from being replayed in another
+    thread_id = (config or {}).get("configurable", {}).get("thread_id", "")
+    return hashlib.blake2b(
+        f"{system_prompt}|{thread_id}|{query}".encode(), digest_size=16
+    ).hexdigest()
+
+
+def _cache_get(key) -> Optional[Any]:
+    hit = _RESPONSES.get(key)
+    if hit is not None and hit[0] > time.monotonic():
+        return hit[1]
+    return None
+
+
+def _cache_put(key, value: Any):
+    _RESPONSES.pop(key, None)
+    if len(_RESPONSES) >= RESPONSE_CACHE_SIZE:
+        _RESPONSES.pop(next(iter(_RESPONSES)))
+    _RESPONSES[key] = (time.monotonic() + RESPONSE_CACHE_TTL, value)
+
+
+async def cached_ainvoke(agent, system_prompt: str, query: str, config: dict) -> Any:
+    """
+    Invoke an agent with a single user message, reusing a recent identical response.
+
+    Failed invocations raise and are not cached.
+    """
+    messages = {"messages": [{"role": "user", "content": query}]}
+    if RESPONSE_CACHE_TTL <= 0:
+        return await agent.ainvoke(messages, config=config)
+    
+    key = _response_key(system_prompt, query, config)
+    result = _cache_get(key)
+    if result is None:
+        result = await agent.ainvoke(messages, config=config)
+        _cache_put(key, result)
+    return result
+
+
+async def cached_astream(agent, system_prompt: str, query: str,
+                         config: dict) -> AsyncIterator[Dict[str, str]]:
+    """
+    Stream the agent's reply as {"content": token} chunks.
+
+    A recent identical reply is replayed as one chunk. A stream is only
+    cached if it runs to completion.
+    """
+    key = _response_key(system_prompt, query, config)
+    if RESPONSE_CACHE_TTL > 0:
+        cached = _cache_get(("stream", key))
+        if cached is not None:
+            yield {"content": cached}
+            return
+    
+    parts = []
+    async for message, _ in agent.astream(
+        {"messages": [{"role": "user", "content": query}]},
+        config=config,
+        stream_mode="messages",
+    ):
+        if getattr(message, "type", None) != "AIMessageChunk":
+            continue
+        # Text blocks only; tool_use argument deltas carry no text
+        content = message.text()
+        if not content:
+            continue
+        parts.append(content)
+        yield {"content": content}
+    
+    if RESPONSE_CACHE_TTL > 0:
+        _cache_put(("stream", key), "".join(parts))
+
+
+def dumps(obj: Any) -> str:
+    """Serialize a result as indented JSON, falling back to str() for unknown types."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str
+        ).decode()
+    return json.dumps(obj, indent=2, default=str)
+
+
+def dump(obj: Any, stream=None):
+    """Write a result as indented JSON to stream (stdout) without building the text first."""
+    stream = stream or sys.stdout
+    if orjson is not None and hasattr(stream, "buffer"):
+        stream.flush()
+        stream.buffer.write(orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+            default=str
+        ))
+        stream.buffer.flush()
+    else:
+        json.dump(obj, stream, indent=2, default=str)
+        stream.write("\n")
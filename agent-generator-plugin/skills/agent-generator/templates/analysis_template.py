@@ -5,16 +5,16 @@ Analysis Agent Template - For data exploration with patterns and insights
 Generated from /analysis-agent command
 """
 
+import functools
 import os
 import sys
 import logging
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 import asyncio
-import json
 
-from langgraph.prebuilt import create_deep_agent
 from langchain_core.tools import tool
-from pydantic import BaseModel, Field
+
+from _toolkit import cached_astream, dump, make_stub_tool
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,12 +24,7 @@ logger = logging.getLogger(__name__)
 
 # === Analysis Planning Tools ===
 
-class AnalysisPlanInput(BaseModel):
-    data_type: str = Field(description="Type of data (e.g., stocks, customers, time-series)")
-    analysis_goal: str = Field(description="What to find in the data")
-
-@tool(args_schema=AnalysisPlanInput)
-def plan_data_analysis(data_type: str, analysis_goal: str) -> str:
+def _plan_data_analysis(data_type: str, analysis_goal: str) -> str:
     """Create a data analysis plan."""
     logger.info(f"Planning analysis for {data_type}")
     plan = f"""
@@ -67,26 +62,31 @@ Goal: {analysis_goal}
 """
     return plan
 
-class LoadDataInput(BaseModel):
-    source: str = Field(description="Data source (CSV, JSON, database)")
-    query: str = Field(description="Data to load")
+plan_data_analysis = make_stub_tool("plan_data_analysis", {
+    "data_type": (str, "Type of data (e.g., stocks, customers, time-series)"),
+    "analysis_goal": (str, "What to find in the data"),
+}, _plan_data_analysis)
 
-@tool(args_schema=LoadDataInput)
-def load_data(source: str, query: str) -> str:
+def _load_data(source: str, query: str) -> str:
     """Load and explore data."""
     logger.info(f"Loading data from {source}")
     return f"Loaded data from {source}\nShape: [1000 rows x 10 columns]\n[Summary statistics would be displayed]"
 
-class AnalyzePatternInput(BaseModel):
-    pattern_type: str = Field(description="Pattern to analyze: correlation, trend, anomaly, cluster")
-    data_columns: List[str] = Field(description="Columns to analyze")
+load_data = make_stub_tool("load_data", {
+    "source": (str, "Data source (CSV, JSON, database)"),
+    "query": (str, "Data to load"),
+}, _load_data)
 
-@tool(args_schema=AnalyzePatternInput)
-def analyze_patterns(pattern_type: str, data_columns: List[str]) -> str:
+def _analyze_patterns(pattern_type: str, data_columns: List[str]) -> str:
     """Detect and analyze patterns in data."""
     logger.info(f"Analyzing {pattern_type} patterns")
     return f"Pattern Analysis ({pattern_type}):\nColumns: {data_columns}\n[Detailed pattern analysis would be displayed]"
 
+analyze_patterns = make_stub_tool("analyze_patterns", {
+    "pattern_type": (str, "Pattern to analyze: correlation, trend, anomaly, cluster"),
+    "data_columns": (List[str], "Columns to analyze"),
+}, _analyze_patterns)
+
 @tool
 def generate_insights() -> str:
     """Generate key insights from analysis."""
@@ -107,10 +107,7 @@ all_tools = [
     create_visualization,
 ]
 
-agent = create_deep_agent(
-    model="claude-sonnet-4-20250514",
-    tools=all_tools,
-    system_prompt="""You are a Data Analysis DeepAgent specializing in deep data exploration.
+SYSTEM_PROMPT = """You are a Data Analysis DeepAgent specializing in deep data exploration.
 
 Your approach:
 1. Plan data analysis strategy
@@ -128,30 +125,46 @@ Always:
 - Create visualizations
 - Document assumptions
 - Iterate on findings
-""",
-    max_iterations=15,
-)
+"""
 
-async def run_analysis(analysis_query: str, session_id: str = "default"):
-    """Run the analysis agent."""
+@functools.lru_cache(maxsize=None)
+def _get_agent():
+    """Build the agent on first use so importing this module stays cheap."""
+    from langgraph.prebuilt import create_deep_agent
+    
+    return create_deep_agent(
+        model="claude-sonnet-4-20250514",
+        tools=all_tools,
+        system_prompt=SYSTEM_PROMPT,
+        max_iterations=15,
+    )
+
+async def run_analysis(analysis_query: str, session_id: str = "default") -> AsyncIterator[dict]:
+    """Run the analysis agent, yielding {"content": ...} chunks as the reply streams in."""
     logger.info(f"Starting analysis: {analysis_query}")
     
     try:
         config = {"configurable": {"thread_id": session_id}}
         
-        result = await agent.ainvoke(
-            {"messages": [{"role": "user", "content": analysis_query}]},
-            config=config
-        )
+        agent = _get_agent()
+        async for chunk in cached_astream(agent, SYSTEM_PROMPT, analysis_query, config):
+            yield chunk
         
         logger.info("Analysis completed successfully")
-        return result
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
-        return {"error": str(e)}
+        yield {"error": str(e)}
+
+async def _main(query: str):
+    async for chunk in run_analysis(query):
+        if "error" in chunk:
+            dump(chunk)
+        else:
+            sys.stdout.write(chunk["content"])
+            sys.stdout.flush()
+    sys.stdout.write("\n")
 
 if __name__ == "__main__":
     query = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else "Analyze stock data for patterns and trends."
     
-    result = asyncio.run(run_analysis(query))
-    print(json.dumps(result, indent=2, default=str))
+    asyncio.run(_main(query))
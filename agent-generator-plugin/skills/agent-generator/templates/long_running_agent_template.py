@@ -5,11 +5,65 @@ Based on Anthropic's long-running agent research.
 Implements the session protocol for multi-window work.
 """
 
+import asyncio
+import itertools
 import json
-import subprocess
+import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+# Read-only bearings probes, batched into a single shell invocation
+_PROBE_SEPARATOR = "---"
+_PROBE_CMD = f"pwd; echo '{_PROBE_SEPARATOR}'; git log --oneline -10 2>/dev/null || echo '__NO_GIT__'"
+
+# Sort rank for features.json priorities; unknown priorities sort last
+_PRIORITY = {'critical': 0, 'high': 1, 'normal': 2, 'low': 3}
+
+# Progress file is rotated to claude-progress.txt.N once it grows past this
+_PROGRESS_ROTATE_BYTES = 1_000_000
+
+
+def _loads_json(data: bytes):
+    """Parse JSON bytes, with orjson when it is installed."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _dumps_json(obj) -> bytes:
+    """Indented JSON as bytes, ready to write to disk."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+
+def _emit(out: List[str]):
+    """Write a block of buffered output lines with a single write and flush."""
+    sys.stdout.write("".join(out))
+    sys.stdout.flush()
+
+
+def _tail_lines(path: Path, count: int, block: int = 8192) -> List[str]:
+    """Return the last `count` lines of a file without reading all of it."""
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        while True:
+            start = max(0, size - block)
+            f.seek(start)
+            lines = f.read().decode(errors='replace').splitlines()
+            if start == 0 or len(lines) > count:
+                return lines[-count:]
+            block *= 2
+
 
 class LongRunningAgent:
     """
@@ -31,7 +85,26 @@ class LongRunningAgent:
         self.progress_file = self.project_dir / "claude-progress.txt"
         self.init_script = self.project_dir / "init.sh"
         
-    def run_session(self):
+        # With pygit2 the repository is opened once and git log / commit run
+        # in-process; otherwise they fall back to the git CLI
+        self._repo = (pygit2.Repository(str(self.project_dir))
+                      if pygit2 is not None and (self.project_dir / ".git").exists()
+                      else None)
+        
+        # features.json is parsed once per session and rewritten only on update;
+        # a missing file is an error, as the initializer agent must create it
+        self._features = _loads_json(self.features_file.read_bytes())
+        
+        # Selection lookups, computed once and kept out of the dicts that
+        # get written back to features.json
+        self._by_id = {f['id']: f for f in self._features}
+        self._completed_ids = frozenset(f['id'] for f in self._features if f.get('passes'))
+        self._priority = {f['id']: _PRIORITY.get(f.get('priority', 'normal'), 99)
+                          for f in self._features}
+        self._blockers = {f['id']: frozenset(f.get('blockers', ()))
+                          for f in self._features}
+        
+    async def run_session(self):
         """Execute complete session protocol"""
         print(f"\n{'='*60}")
         print(f"SESSION {self.session_num}: {self.project_id}")
@@ -39,7 +112,7 @@ class LongRunningAgent:
         
         # Phase 1: Get Bearings
         print("[1/5] Getting bearings...\n")
-        self.get_bearings()
+        await self.get_bearings()
         
         # Phase 2: Select Work
         print("[2/5] Selecting work...\n")
@@ -51,7 +124,7 @@ class LongRunningAgent:
         
         # Phase 4: Verify & Commit
         print("[4/5] Verifying and committing...\n")
-        self.verify_and_commit(features)
+        await self.verify_and_commit(features)
         
         # Phase 5: Handoff
         print("[5/5] Preparing handoff...\n")
@@ -61,7 +134,32 @@ class LongRunningAgent:
         print(f"SESSION {self.session_num} COMPLETE")
         print(f"{'='*60}\n")
     
-    def get_bearings(self):
+    async def _run(self, *cmd: str) -> Tuple[int, str, str]:
+        """Run a command in the project directory without blocking the event loop."""
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=self.project_dir,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate()
+        return proc.returncode, stdout.decode(), stderr.decode()
+    
+    async def _probe(self) -> Tuple[str, str]:
+        """Current directory and `git log --oneline -10` output."""
+        if self._repo is not None:
+            return str(self.project_dir.resolve()), self._git_log(10)
+        _, probe_out, _ = await self._run('bash', '-c', _PROBE_CMD)
+        cwd_out, _, git_out = probe_out.partition(f"{_PROBE_SEPARATOR}\n")
+        return cwd_out, git_out
+    
+    def _read_progress_tail(self) -> Optional[List[str]]:
+        """Last 30 lines of the progress file, or None before the first session."""
+        if not self.progress_file.exists():
+            return None
+        return _tail_lines(self.progress_file, 30)
+    
+    async def get_bearings(self):
         """
         Phase 1: Understand project state
         - Run init.sh
@@ -70,58 +168,56 @@ class LongRunningAgent:
         - Run baseline tests
         """
         
-        # Step 1: Current directory
-        print("  $ pwd")
-        result = subprocess.run(['pwd'], capture_output=True, text=True)
-        print(f"  {result.stdout.strip()}")
+        # Steps 1-3 are independent: the pwd/git log probe and the progress
+        # file read run concurrently
+        progress_task = asyncio.create_task(asyncio.to_thread(self._read_progress_tail))
+        cwd_out, git_out = await self._probe()
+        
+        # Step 4 (started early): init.sh runs once git log has been read,
+        # overlapping with whatever is left of the progress file read
+        init_task = None
+        if self.init_script.exists():
+            init_task = asyncio.create_task(self._run('bash', self.init_script.name))
+        progress_lines = await progress_task
+        
+        out = ["  $ pwd\n", f"  {cwd_out.strip()}\n"]
         
         # Step 2: Read progress file
-        print("\n  $ cat claude-progress.txt (last 30 lines)")
-        if self.progress_file.exists():
-            with open(self.progress_file) as f:
-                lines = f.readlines()
-                for line in lines[-30:]:
-                    print(f"  {line.rstrip()}")
+        out.append("\n  $ cat claude-progress.txt (last 30 lines)\n")
+        if progress_lines is not None:
+            out.extend(f"  {line.rstrip()}\n" for line in progress_lines)
         else:
-            print("  [Progress file not found - this is first session]")
-        
-        # Step 3: Git log
-        print("\n  $ git log --oneline -10")
-        result = subprocess.run(['git', 'log', '--oneline', '-10'],
-                              cwd=self.project_dir,
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            for line in result.stdout.strip().split('\n'):
-                print(f"  {line}")
+            out.append("  [Progress file not found - this is first session]\n")
+        
+        out.append("\n  $ git log --oneline -10\n")
+        if git_out.strip() != "__NO_GIT__":
+            out.append("  " + git_out.strip().replace("\n", "\n  ") + "\n")
         else:
-            print("  [Git repo not initialized yet]")
+            out.append("  [Git repo not initialized yet]\n")
         
-        # Step 4: Run init script
-        print("\n  $ bash init.sh")
-        if self.init_script.exists():
-            result = subprocess.run(['bash', str(self.init_script)],
-                                  cwd=self.project_dir,
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print("  ✓ Environment ready")
+        out.append("\n  $ bash init.sh\n")
+        if init_task is not None:
+            returncode, _, stderr = await init_task
+            if returncode == 0:
+                out.append("  ✓ Environment ready\n")
             else:
-                print(f"  ✗ Environment setup failed:\n{result.stderr}")
+                out.append(f"  ✗ Environment setup failed:\n{stderr}\n")
+                _emit(out)
                 raise RuntimeError("Environment setup failed")
         else:
-            print("  [init.sh not found]")
+            out.append("  [init.sh not found]\n")
         
         # Step 5: Run baseline tests
-        print("\n  $ pytest tests/baseline_test.py")
-        result = subprocess.run(['pytest', 'tests/baseline_test.py', '-v'],
-                              cwd=self.project_dir,
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            print("  ✓ Baseline tests PASS")
+        out.append("\n  $ pytest tests/baseline_test.py\n")
+        returncode, stdout = await self._run_baseline_tests('-v')
+        if returncode == 0:
+            out.append("  ✓ Baseline tests PASS\n")
             self.baseline_passed = True
         else:
-            print(f"  ✗ Baseline tests FAIL")
-            print(result.stdout)
+            out.append("  ✗ Baseline tests FAIL\n")
+            out.append(f"{stdout}\n")
             self.baseline_passed = False
+        _emit(out)
     
     def select_work(self) -> List[dict]:
         """
@@ -132,23 +228,25 @@ class LongRunningAgent:
         - Select up to N features
         """
         
-        with open(self.features_file) as f:
-            all_features = json.load(f)
+        all_features = self._features
         
         # Find incomplete features
         incomplete = [f for f in all_features if not f.get('passes', False)]
         
-        print(f"  Total features: {len(all_features)}")
-        print(f"  Incomplete: {len(incomplete)}")
-        print(f"  Complete: {len(all_features) - len(incomplete)}")
+        out = [
+            f"  Total features: {len(all_features)}\n",
+            f"  Incomplete: {len(incomplete)}\n",
+            f"  Complete: {len(all_features) - len(incomplete)}\n",
+        ]
         
         # Select features to work on (respect priorities and dependencies)
         features_to_work = self._select_prioritized_features(incomplete, max_count=3)
         
-        print(f"\n  Selected for this session:")
+        out.append("\n  Selected for this session:\n")
         for f in features_to_work:
             deps_str = f"(depends on: {', '.join(f['blockers'])})" if f.get('blockers') else ""
-            print(f"    - Feature {f['id']}: {f['description'][:50]}... {deps_str}")
+            out.append(f"    - Feature {f['id']}: {f['description'][:50]}... {deps_str}\n")
+        _emit(out)
         
         return features_to_work
     
@@ -161,23 +259,23 @@ class LongRunningAgent:
         """
         
         for feature in features:
-            print(f"\n  Implementing Feature {feature['id']}: {feature['description']}")
-            print(f"  Steps:")
-            for step in feature.get('steps', []):
-                print(f"    - {step}")
+            out = [f"\n  Implementing Feature {feature['id']}: {feature['description']}\n",
+                   "  Steps:\n"]
+            out.extend(f"    - {step}\n" for step in feature.get('steps', []))
             
             # This is where the actual AI agent would write code
             # For this template, we just mark it as "implemented"
-            print(f"\n  [Implementation would happen here]")
-            print(f"  [Code testing would happen here]")
-            print(f"  [Committing progress...]")
+            out.append("\n  [Implementation would happen here]\n"
+                       "  [Code testing would happen here]\n"
+                       "  [Committing progress...]\n")
+            _emit(out)
             
             # In real implementation:
             # - Write code
             # - Test thoroughly
             # - Commit with git
     
-    def verify_and_commit(self, features: List[dict]):
+    async def verify_and_commit(self, features: List[dict]):
         """
         Phase 4: Verify features work and commit
         - Run tests
@@ -187,44 +285,36 @@ class LongRunningAgent:
         """
         
         print("  Running baseline tests...")
-        result = subprocess.run(['pytest', 'tests/baseline_test.py', '-q'],
-                              cwd=self.project_dir,
-                              capture_output=True, text=True)
+        returncode, stdout = await self._run_baseline_tests('-q')
         
-        if result.returncode == 0:
+        if returncode == 0:
             print("  ✓ Baseline tests PASS")
             self.baseline_passed = True
         else:
             print(f"  ✗ Baseline tests FAIL")
-            print(result.stdout)
+            print(stdout)
             raise RuntimeError("Baseline tests must pass before committing")
         
         # Update features.json
-        with open(self.features_file) as f:
-            all_features = json.load(f)
-        
         for feature in features:
-            for f in all_features:
-                if f['id'] == feature['id']:
-                    f['passes'] = True
-                    f['verified_in_session'] = self.session_num
-                    break
+            target = self._by_id[feature['id']]
+            target['passes'] = True
+            target['verified_in_session'] = self.session_num
         
-        with open(self.features_file, 'w') as f:
-            json.dump(all_features, f, indent=2)
+        self.features_file.write_bytes(_dumps_json(self._features))
+        self._completed_ids |= {f['id'] for f in features}
         
         print(f"\n  Updated features.json")
         
         # Create git commit
-        commit_msg = f"Complete features {', '.join([f['id'] for f in features])}\n\n"
-        for f in features:
-            commit_msg += f"- Feature {f['id']}: {f['description']}\n"
-        commit_msg += f"\nAll baseline tests passing"
+        feature_lines = "".join(f"- Feature {f['id']}: {f['description']}\n" for f in features)
+        commit_msg = (
+            f"Complete features {', '.join(f['id'] for f in features)}\n\n"
+            f"{feature_lines}"
+            f"\nAll baseline tests passing"
+        )
         
-        subprocess.run(['git', 'add', '-A'],
-                      cwd=self.project_dir, capture_output=True)
-        subprocess.run(['git', 'commit', '-m', commit_msg],
-                      cwd=self.project_dir, capture_output=True)
+        await self._commit(commit_msg)
         
         print(f"  Created git commit")
     
@@ -237,27 +327,76 @@ class LongRunningAgent:
         """
         
         # Append to progress file
-        handoff_text = f"\n{'='*70}\n"
-        handoff_text += f"SESSION {self.session_num} [{datetime.now().isoformat()}]\n"
-        handoff_text += f"{'='*70}\n\n"
-        handoff_text += f"Features Completed: {len(features)}\n"
-        for f in features:
-            handoff_text += f"- Feature {f['id']}: PASS\n"
-        
-        handoff_text += f"\nBaseline Status: {'PASS ✓' if self.baseline_passed else 'FAIL ✗'}\n"
-        handoff_text += f"Status: CLEAN STATE ✓\n\n"
-        handoff_text += f"Next Session Guidance:\n"
-        handoff_text += f"1. Run bash init.sh to start environment\n"
-        handoff_text += f"2. Run pytest tests/baseline_test.py to verify nothing broke\n"
-        handoff_text += f"3. Work on next priority features\n"
-        handoff_text += f"4. Test thoroughly before marking complete\n"
+        feature_lines = "".join(f"- Feature {f['id']}: PASS\n" for f in features)
+        handoff_text = (
+            f"\n{'='*70}\n"
+            f"SESSION {self.session_num} [{datetime.now().isoformat()}]\n"
+            f"{'='*70}\n\n"
+            f"Features Completed: {len(features)}\n"
+            f"{feature_lines}"
+            f"\nBaseline Status: {'PASS ✓' if self.baseline_passed else 'FAIL ✗'}\n"
+            "Status: CLEAN STATE ✓\n\n"
+            "Next Session Guidance:\n"
+            "1. Run bash init.sh to start environment\n"
+            "2. Run pytest tests/baseline_test.py to verify nothing broke\n"
+            "3. Work on next priority features\n"
+            "4. Test thoroughly before marking complete\n"
+        )
         
+        self._rotate_progress_file()
         with open(self.progress_file, 'a') as f:
             f.write(handoff_text)
         
         print(f"  Updated claude-progress.txt")
         print(f"  Handoff documentation complete")
     
+    async def _run_baseline_tests(self, *args: str) -> Tuple[int, str]:
+        """Run tests/baseline_test.py in a fresh interpreter so edited modules are reloaded."""
+        returncode, stdout, _ = await self._run('pytest', 'tests/baseline_test.py', *args)
+        return returncode, stdout
+    
+    def _git_log(self, count: int) -> str:
+        """`git log --oneline -<count>` from the open pygit2 repository."""
+        if self._repo.head_is_unborn:
+            return "__NO_GIT__"
+        commits = itertools.islice(
+            self._repo.walk(self._repo.head.target, pygit2.GIT_SORT_TIME), count
+        )
+        return "\n".join(
+            f"{c.short_id} {c.message.splitlines()[0] if c.message else ''}" for c in commits
+        )
+    
+    async def _commit(self, message: str):
+        """Stage everything (like `git add -A`) and commit."""
+        if self._repo is None:
+            await self._run('git', 'add', '-A')
+            await self._run('git', 'commit', '-m', message)
+            return
+        
+        index = self._repo.index
+        index.add_all()
+        for path, flags in self._repo.status().items():
+            if flags & pygit2.GIT_STATUS_WT_DELETED:
+                index.remove(path)
+        index.write()
+        tree = index.write_tree()
+        try:
+            author = self._repo.default_signature
+        except KeyError:
+            author = pygit2.Signature('agent', 'agent@local')
+        parents = [] if self._repo.head_is_unborn else [self._repo.head.target]
+        self._repo.create_commit('HEAD', author, author, message, tree, parents)
+    
+    def _rotate_progress_file(self):
+        """Move an oversized progress file aside so the next one starts fresh."""
+        if (not self.progress_file.exists()
+                or self.progress_file.stat().st_size <= _PROGRESS_ROTATE_BYTES):
+            return
+        n = 1
+        while self.progress_file.with_name(f"{self.progress_file.name}.{n}").exists():
+            n += 1
+        self.progress_file.rename(self.progress_file.with_name(f"{self.progress_file.name}.{n}"))
+    
     def _select_prioritized_features(self, incomplete: List[dict],
                                     max_count: int = 3) -> List[dict]:
         """
@@ -268,16 +407,9 @@ class LongRunningAgent:
         selected = []
         
         # Sort by priority
-        priority_order = {'critical': 0, 'high': 1, 'normal': 2, 'low': 3}
-        incomplete_sorted = sorted(
-            incomplete,
-            key=lambda f: priority_order.get(f.get('priority', 'normal'), 99)
-        )
-        
-        # Get completed feature IDs
-        with open(self.features_file) as f:
-            all_features = json.load(f)
-        completed = {f['id'] for f in all_features if f.get('passes')}
+        priority = self._priority
+        incomplete_sorted = sorted(incomplete, key=lambda f: priority[f['id']])
+        completed = self._completed_ids
         
         # Select features with met dependencies
         for feature in incomplete_sorted:
@@ -285,7 +417,7 @@ class LongRunningAgent:
                 break
             
             # Check if dependencies are met
-            blockers = set(feature.get('blockers', []))
+            blockers = self._blockers[feature['id']]
             if blockers and not blockers.issubset(completed):
                 continue  # Skip if dependencies not met
             
@@ -297,8 +429,6 @@ class LongRunningAgent:
 def main():
     """Run a session of the long-running agent"""
     
-    import sys
-    
     if len(sys.argv) < 3:
         print("Usage: python long_running_agent_template.py <project_id> <session_num>")
         sys.exit(1)
@@ -307,7 +437,7 @@ def main():
     session_num = int(sys.argv[2])
     
     agent = LongRunningAgent(project_id, session_num)
-    agent.run_session()
+    asyncio.run(agent.run_session())
 
 
 if __name__ == "__main__":
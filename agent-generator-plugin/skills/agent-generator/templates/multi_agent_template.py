@@ -5,17 +5,20 @@ Multi-Agent Team Template - Coordinator spawns specialist workers for parallel p
 Generated from /multi-agent-team command
 """
 
+import functools
+import itertools
 import os
 import sys
 import logging
 from typing import Optional, List
 import asyncio
-import json
 from dataclasses import dataclass
 
-from langgraph.prebuilt import create_deep_agent
+from langchain_core.messages import AIMessage
 from langchain_core.tools import tool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
+
+from _toolkit import cached_ainvoke, dump, make_stub_tool
 
 logging.basicConfig(
     level=logging.INFO,
@@ -25,12 +28,7 @@ logger = logging.getLogger(__name__)
 
 # === Coordinator Tools ===
 
-class WorkPlanInput(BaseModel):
-    task: str = Field(description="Large task to distribute")
-    num_workers: int = Field(description="Number of workers to create")
-
-@tool(args_schema=WorkPlanInput)
-def plan_work_distribution(task: str, num_workers: int) -> str:
+def _plan_work_distribution(task: str, num_workers: int) -> str:
     """Plan how to distribute work among workers."""
     logger.info(f"Planning work distribution for {num_workers} workers")
     plan = f"""
@@ -49,6 +47,11 @@ Distribution Strategy:
 """
     return plan
 
+plan_work_distribution = make_stub_tool("plan_work_distribution", {
+    "task": (str, "Large task to distribute"),
+    "num_workers": (int, "Number of workers to create"),
+}, _plan_work_distribution)
+
 @tool
 def spawn_worker_agents(num_workers: int = 5) -> str:
     """Spawn N specialist worker agents."""
@@ -58,29 +61,25 @@ def spawn_worker_agents(num_workers: int = 5) -> str:
 
 # === Aggregator Tools ===
 
-class AggregateInput(BaseModel):
-    worker_results: List[str] = Field(description="Results from each worker")
+class AggregateAllOutput(BaseModel):
+    aggregated: str
+    patterns: str
+    alerts: str
+    summary: str
 
-@tool(args_schema=AggregateInput)
-def aggregate_results(worker_results: List[str]) -> str:
-    """Combine results from multiple workers."""
+def _aggregate_and_summarize(worker_results: List[str]) -> str:
+    """Combine worker results and return aggregated findings, cross-worker patterns, alerts and an executive summary in one call."""
     logger.info(f"Aggregating {len(worker_results)} worker results")
-    return f"Aggregated Results:\n[Unified findings from all workers]"
+    return AggregateAllOutput(
+        aggregated="Aggregated Results:\n[Unified findings from all workers]",
+        patterns="Cross-Worker Patterns:\n[Patterns identified from aggregated results]",
+        alerts="Alerts:\n[High-priority items flagged for attention]",
+        summary="Summary Report:\n[Executive overview of all findings]",
+    ).model_dump_json()
 
-@tool
-def identify_patterns() -> str:
-    """Find patterns across all worker results."""
-    return "Cross-Worker Patterns:\n[Patterns identified from aggregated results]"
-
-@tool
-def generate_alerts() -> str:
-    """Generate alerts for high-priority findings."""
-    return "Alerts:\n[High-priority items flagged for attention]"
-
-@tool
-def create_summary_report() -> str:
-    """Create executive summary of findings."""
-    return "Summary Report:\n[Executive overview of all findings]"
+aggregate_and_summarize = make_stub_tool("aggregate_and_summarize", {
+    "worker_results": (List[str], "Results from each worker"),
+}, _aggregate_and_summarize)
 
 # === Coordinator Agent ===
 
@@ -89,10 +88,7 @@ coordinator_tools = [
     spawn_worker_agents,
 ]
 
-coordinator = create_deep_agent(
-    model="claude-sonnet-4-20250514",
-    tools=coordinator_tools,
-    system_prompt="""You are a Coordinator DeepAgent managing a team of specialist workers.
+COORDINATOR_PROMPT = """You are a Coordinator DeepAgent managing a team of specialist workers.
 
 Your approach:
 1. Plan work distribution for the task
@@ -108,31 +104,34 @@ Always:
 - Monitor progress
 - Handle worker failures
 - Coordinate handoff to aggregator
-""",
-    max_iterations=10,
-)
+"""
+
+@functools.lru_cache(maxsize=None)
+def _get_coordinator():
+    """Build the coordinator on first use so importing this module stays cheap."""
+    from langgraph.prebuilt import create_deep_agent
+    
+    return create_deep_agent(
+        model="claude-sonnet-4-20250514",
+        tools=coordinator_tools,
+        system_prompt=COORDINATOR_PROMPT,
+        max_iterations=10,
+    )
 
 # === Aggregator Agent ===
 
 aggregator_tools = [
-    aggregate_results,
-    identify_patterns,
-    generate_alerts,
-    create_summary_report,
+    aggregate_and_summarize,
 ]
 
-aggregator = create_deep_agent(
-    model="claude-sonnet-4-20250514",
-    tools=aggregator_tools,
-    system_prompt="""You are an Aggregator DeepAgent combining results from specialist workers.
+AGGREGATOR_PROMPT = """You are an Aggregator DeepAgent combining results from specialist workers.
 
 Your approach:
 1. Receive results from all workers
-2. Combine and deduplicate
-3. Identify cross-worker patterns
-4. Flag high-priority findings
-5. Generate unified report
-6. Create executive summary
+2. Call aggregate_and_summarize once with all worker results; it returns the
+   combined findings, cross-worker patterns, alerts and executive summary
+3. Combine and deduplicate
+4. Generate unified report from its output
 
 Always:
 - Validate data quality
@@ -140,57 +139,109 @@ Always:
 - Resolve conflicts in findings
 - Highlight anomalies
 - Generate actionable insights
-""",
-    max_iterations=10,
-)
+"""
+
+@functools.lru_cache(maxsize=None)
+def _get_aggregator():
+    """Build the aggregator on first use so importing this module stays cheap."""
+    from langgraph.prebuilt import create_deep_agent
+    
+    return create_deep_agent(
+        model="claude-sonnet-4-20250514",
+        tools=aggregator_tools,
+        system_prompt=AGGREGATOR_PROMPT,
+        max_iterations=10,
+    )
 
 class MultiAgentTeam:
     """Orchestrates multi-agent parallel processing."""
     
     def __init__(self, num_workers: int = 5):
         self.num_workers = num_workers
-        self.coordinator = coordinator
-        self.aggregator = aggregator
         logger.info(f"Initialized multi-agent team with {num_workers} workers")
     
-    async def run(self, task: str, items: List[str], session_id: str = "default"):
-        """Run the multi-agent team."""
+    # Built on first use: planning is opt-in and a single result skips aggregation
+    @property
+    def coordinator(self):
+        return _get_coordinator()
+    
+    @property
+    def aggregator(self):
+        return _get_aggregator()
+    
+    async def _run_worker(self, worker_id: int, batch: List[str], session_id: str) -> str:
+        """Process one batch (replace the placeholder with a worker agent's ainvoke)."""
+        logger.info(f"Worker {worker_id} processing {len(batch)} items")
+        await asyncio.sleep(0)
+        return f"Worker_{worker_id}_results: Processed {batch}"
+    
+    async def run(self, task: str, items: List[str], session_id: str = "default",
+                  plan: bool = False):
+        """
+        Run the multi-agent team.
+        
+        Batches are sliced deterministically, so the coordinator's planning
+        call is skipped unless plan=True asks for the plan to be reported.
+        """
         logger.info(f"Starting multi-agent processing: {task}")
         
         try:
-            # 1. Coordinator plans work
-            config = {"configurable": {"thread_id": f"{session_id}_coordinator"}}
-            plan_result = await coordinator.ainvoke(
-                {"messages": [{"role": "user", "content": f"Distribute this work: {task}"}]},
-                config=config
-            )
+            # 1. Coordinator plans work while workers start on their batches
+            # (the plan does not feed into how items are sliced)
+            if plan:
+                config = {"configurable": {"thread_id": f"{session_id}_coordinator"}}
+                planning = cached_ainvoke(self.coordinator, COORDINATOR_PROMPT,
+                                          f"Distribute this work: {task}", config)
+            else:
+                planning = asyncio.sleep(0, result={"skipped": True})
+            
+            # 2. Workers process their batches in parallel; batch sizes
+            # differ by at most one so no worker carries the whole remainder
+            q, r = divmod(len(items), self.num_workers)
+            sizes = [q + (1 if i < r else 0) for i in range(self.num_workers)]
+            offsets = list(itertools.accumulate(sizes, initial=0))
+            workers = [
+                self._run_worker(i + 1, items[offsets[i]:offsets[i + 1]], session_id)
+                for i in range(self.num_workers)
+            ]
+            
+            plan_result, *outcomes = await asyncio.gather(planning, *workers, return_exceptions=True)
+            if isinstance(plan_result, BaseException):
+                raise plan_result
             logger.info("Coordinator planning complete")
             
-            # 2. Spawn workers (simulated)
-            batch_size = len(items) // self.num_workers
+            # A failed worker must not cancel the others
             worker_results = []
+            failed_workers = []
+            for worker_id, outcome in enumerate(outcomes, start=1):
+                if isinstance(outcome, BaseException):
+                    logger.error(f"Worker {worker_id} failed: {outcome}")
+                    failed_workers.append(worker_id)
+                else:
+                    worker_results.append(outcome)
             
-            for i in range(self.num_workers):
-                start = i * batch_size
-                end = start + batch_size if i < self.num_workers - 1 else len(items)
-                batch = items[start:end]
-                
-                # Worker processes batch
-                logger.info(f"Worker {i+1} processing {len(batch)} items")
-                worker_result = f"Worker_{i+1}_results: Processed {batch}"
-                worker_results.append(worker_result)
+            if not worker_results:
+                logger.error("All workers failed; nothing to aggregate")
+                return {
+                    "error": "All workers failed",
+                    "failed_workers": failed_workers,
+                    "status": "failed"
+                }
             
-            # 3. Aggregator combines results
-            config = {"configurable": {"thread_id": f"{session_id}_aggregator"}}
-            agg_result = await aggregator.ainvoke(
-                {"messages": [{"role": "user", "content": f"Aggregate these results: {worker_results}"}]},
-                config=config
-            )
-            logger.info("Aggregation complete")
+            # 3. Aggregator combines results. A single result has nothing to
+            # combine, so it is wrapped in the same agent-state shape instead
+            if len(worker_results) == 1:
+                agg_result = {"messages": [AIMessage(content=worker_results[0])]}
+            else:
+                config = {"configurable": {"thread_id": f"{session_id}_aggregator"}}
+                agg_result = await cached_ainvoke(self.aggregator, AGGREGATOR_PROMPT,
+                                                  f"Aggregate these results: {worker_results}", config)
+                logger.info("Aggregation complete")
             
             return {
                 "coordinator_plan": plan_result,
                 "worker_results": worker_results,
+                "failed_workers": failed_workers,
                 "aggregated": agg_result,
                 "status": "success"
             }
@@ -199,14 +250,15 @@ class MultiAgentTeam:
             logger.error(f"Multi-agent processing failed: {e}")
             return {"error": str(e), "status": "failed"}
 
-async def run_team(task: str, num_workers: int = 5, session_id: str = "default"):
+async def run_team(task: str, num_workers: int = 5, session_id: str = "default",
+                   plan: bool = False):
     """Run multi-agent team."""
     team = MultiAgentTeam(num_workers=num_workers)
     
     # Example items to process
     items = [f"item_{i}" for i in range(100)]
     
-    result = await team.run(task, items, session_id)
+    result = await team.run(task, items, session_id, plan=plan)
     return result
 
 if __name__ == "__main__":
@@ -214,4 +266,4 @@ if __name__ == "__main__":
     num_workers = int(os.getenv("NUM_WORKERS", "5"))
     
     result = asyncio.run(run_team(task, num_workers=num_workers))
-    print(json.dumps(result, indent=2, default=str))
+    dump(result)
@@ -5,16 +5,16 @@ Problem Solver Agent Template - For root cause analysis and solution generation
 Generated from /problem-solver command
 """
 
+import functools
 import os
 import sys
 import logging
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 import asyncio
-import json
 
-from langgraph.prebuilt import create_deep_agent
 from langchain_core.tools import tool
-from pydantic import BaseModel, Field
+
+from _toolkit import cached_astream, dump, make_stub_tool
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,12 +24,7 @@ logger = logging.getLogger(__name__)
 
 # === Problem-Solving Tools ===
 
-class ProblemAnalysisInput(BaseModel):
-    problem: str = Field(description="Problem statement")
-    context: str = Field(description="Business context and constraints")
-
-@tool(args_schema=ProblemAnalysisInput)
-def analyze_problem(problem: str, context: str) -> str:
+def _analyze_problem(problem: str, context: str) -> str:
     """Analyze and decompose a problem."""
     logger.info(f"Analyzing problem: {problem}")
     analysis = f"""
@@ -49,23 +44,22 @@ s
 """
     return analysis
 
-class RootCauseInput(BaseModel):
-    problem_area: str = Field(description="Area to analyze for root causes")
-    hypotheses: List[str] = Field(description="Potential causes to investigate")
+analyze_problem = make_stub_tool("analyze_problem", {
+    "problem": (str, "Problem statement"),
+    "context": (str, "Business context and constraints"),
+}, _analyze_problem)
 
-@tool(args_schema=RootCauseInput)
-def investigate_root_causes(problem_area: str, hypotheses: List[str]) -> str:
+def _investigate_root_causes(problem_area: str, hypotheses: List[str]) -> str:
     """Investigate potential root causes."""
     logger.info(f"Investigating root causes in {problem_area}")
     return f"Root Cause Investigation:\n{problem_area}\nHypotheses: {hypotheses}\n[Evidence and analysis would be displayed]"
 
-class SolutionInput(BaseModel):
-    problem: str = Field(description="Problem to solve")
-    constraints: List[str] = Field(description="Implementation constraints")
-    num_solutions: int = Field(default=3, description="Number of solutions to generate")
+investigate_root_causes = make_stub_tool("investigate_root_causes", {
+    "problem_area": (str, "Area to analyze for root causes"),
+    "hypotheses": (List[str], "Potential causes to investigate"),
+}, _investigate_root_causes)
 
-@tool(args_schema=SolutionInput)
-def generate_solutions(problem: str, constraints: List[str], num_solutions: int = 3) -> str:
+def _generate_solutions(problem: str, constraints: List[str], num_solutions: int = 3) -> str:
     """Generate multiple solutions to a problem."""
     logger.info(f"Generating {num_solutions} solutions")
     solutions = f"""
@@ -80,16 +74,22 @@ Solution 3: [Approach C with rationale]
 """
     return solutions
 
-class EvaluateInput(BaseModel):
-    solutions: List[str] = Field(description="Solutions to evaluate")
-    criteria: List[str] = Field(description="Evaluation criteria")
+generate_solutions = make_stub_tool("generate_solutions", {
+    "problem": (str, "Problem to solve"),
+    "constraints": (List[str], "Implementation constraints"),
+    "num_solutions": (int, "Number of solutions to generate", 3),
+}, _generate_solutions)
 
-@tool(args_schema=EvaluateInput)
-def evaluate_solutions(solutions: List[str], criteria: List[str]) -> str:
+def _evaluate_solutions(solutions: List[str], criteria: List[str]) -> str:
     """Evaluate and rank solutions."""
     logger.info(f"Evaluating {len(solutions)} solutions")
     return "Solution Evaluation:\n[Scoring matrix and rankings would be displayed]"
 
+evaluate_solutions = make_stub_tool("evaluate_solutions", {
+    "solutions": (List[str], "Solutions to evaluate"),
+    "criteria": (List[str], "Evaluation criteria"),
+}, _evaluate_solutions)
+
 @tool
 def generate_recommendations() -> str:
     """Generate final recommendations with implementation plan."""
@@ -105,10 +105,7 @@ all_tools = [
     generate_recommendations,
 ]
 
-agent = create_deep_agent(
-    model="claude-sonnet-4-20250514",
-    tools=all_tools,
-    system_prompt="""You are a Problem Solver DeepAgent specializing in systematic problem-solving.
+SYSTEM_PROMPT = """You are a Problem Solver DeepAgent specializing in systematic problem-solving.
 
 Your approach:
 1. Analyze and decompose the problem
@@ -126,30 +123,46 @@ Always:
 - Consider constraints
 - Provide actionable recommendations
 - Document reasoning
-""",
-    max_iterations=15,
-)
+"""
 
-async def solve_problem(problem_statement: str, session_id: str = "default"):
-    """Run the problem solver agent."""
+@functools.lru_cache(maxsize=None)
+def _get_agent():
+    """Build the agent on first use so importing this module stays cheap."""
+    from langgraph.prebuilt import create_deep_agent
+    
+    return create_deep_agent(
+        model="claude-sonnet-4-20250514",
+        tools=all_tools,
+        system_prompt=SYSTEM_PROMPT,
+        max_iterations=15,
+    )
+
+async def solve_problem(problem_statement: str, session_id: str = "default") -> AsyncIterator[dict]:
+    """Run the problem solver agent, yielding {"content": ...} chunks as the reply streams in."""
     logger.info(f"Starting problem analysis: {problem_statement}")
     
     try:
         config = {"configurable": {"thread_id": session_id}}
         
-        result = await agent.ainvoke(
-            {"messages": [{"role": "user", "content": problem_statement}]},
-            config=config
-        )
+        agent = _get_agent()
+        async for chunk in cached_astream(agent, SYSTEM_PROMPT, problem_statement, config):
+            yield chunk
         
         logger.info("Problem solving completed")
-        return result
     except Exception as e:
         logger.error(f"Problem solving failed: {e}")
-        return {"error": str(e)}
+        yield {"error": str(e)}
+
+async def _main(query: str):
+    async for chunk in solve_problem(query):
+        if "error" in chunk:
+            dump(chunk)
+        else:
+            sys.stdout.write(chunk["content"])
+            sys.stdout.flush()
+    sys.stdout.write("\n")
 
 if __name__ == "__main__":
     query = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else "API latency is 500ms. Find root causes and propose solutions."
     
-    result = asyncio.run(solve_problem(query))
-    print(json.dumps(result, indent=2, default=str))
+    asyncio.run(_main(query))